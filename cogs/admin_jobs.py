@@ -0,0 +1,131 @@
+# cogs/admin_jobs.py
+import asyncio
+from discord.ext import commands
+from core.admin_jobs import ADMIN_JOB_POLL_INTERVAL, batches, skipped_note
+
+USER_ACTIONS = {
+    "reset_xp": "XP zurückgesetzt",
+    "reset_coins": "Coins zurückgesetzt",
+}
+
+class AdminJobsCog(commands.Cog):
+    # Arbeitet die Aufträge aus dem Admin-Panel nacheinander ab — in Häppchen, damit der Bot dazwischen weiterläuft
+    def __init__(self, bot):
+        self.bot = bot
+        self.queue = bot.admin_jobs
+        self.handlers = {
+            "twitch_add": self.run_twitch_add,
+            "reset_xp": self.run_user_action,
+            "reset_coins": self.run_user_action,
+            "delete_user": self.run_user_action,
+        }
+        self._task = None
+
+    async def cog_load(self):
+        requeued = await self.queue.requeue_interrupted()
+        if requeued:
+            await self.bot.log(f"AdminJobsCog: {requeued} unterbrochene Aufträge neu eingereiht.", "WARNING")
+        self._task = asyncio.create_task(self.run())
+
+    async def cog_unload(self):
+        if self._task:
+            self._task.cancel()
+
+    async def run(self):
+        while True:
+            try:
+                job = await self.queue.claim()
+            except Exception as e:
+                await self.bot.log(f"AdminJobsCog: Auftragsliste nicht lesbar: {e}", "ERROR")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self.queue.wakeup.wait(), ADMIN_JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self.queue.wakeup.clear()
+                continue
+
+            job_id, kind, payload = job
+            try:
+                result = await self.handlers[kind](job_id, kind, payload)
+            except Exception as e:
+                await self.queue.finish(job_id, "failed", str(e))
+                await self.bot.log(f"Admin-Auftrag #{job_id} ({kind}) fehlgeschlagen: {e}", "ERROR")
+                continue
+            await self.queue.finish(job_id, "done", result)
+            self.bot.dashboard.mark_dirty()
+            await self.bot.log(f"Admin-Auftrag #{job_id} ({kind}): {result}", "SUCCESS")
+
+    def require_cog(self, name):
+        cog = self.bot.get_cog(name)
+        if cog is None:
+            raise RuntimeError(f"{name} ist nicht geladen")
+        return cog
+
+    async def run_user_action(self, job_id, action, payload):
+        user_ids = payload["user_ids"]
+        leveling = self.require_cog("LevelingCog") if action != "reset_coins" else None
+        birthdays = self.bot.get_cog("BirthdayManagerCog") if action == "delete_user" else None
+
+        # Gezählt wird, was sich in der DB wirklich geändert hat — IDs ohne Eintrag zählen nicht mit
+        levels = coins = birthday_entries = 0
+        done = 0
+        for batch in batches(user_ids):
+            if action == "reset_xp":
+                levels += await leveling.reset_users(batch)
+            elif action == "reset_coins":
+                cleared = await self.bot.wallet.clear_many(batch, "admin")
+                coins += sum(1 for balance in cleared.values() if balance)
+            else:
+                levels += await leveling.reset_users(batch, delete=True)
+                cleared = await self.bot.wallet.clear_many(batch, "admin", delete=True)
+                coins += sum(1 for balance in cleared.values() if balance is not None)
+                if birthdays:
+                    birthday_entries += await birthdays.store.remove_many(batch)
+            done += len(batch)
+            await self.queue.progress(job_id, done)
+            await asyncio.sleep(0)
+
+        if action == "delete_user":
+            result = f"Löschen für {len(user_ids)} IDs: {levels} Level-Einträge, {coins} Konten, {birthday_entries} Geburtstage entfernt"
+        else:
+            changed = levels if action == "reset_xp" else coins
+            result = f"{changed} User {USER_ACTIONS[action]}, {len(user_ids) - changed} ohne Änderung"
+        return result + skipped_note(payload.get("skipped"))
+
+    def alert_channel(self, guild):
+        # Das Dashboard kennt keine Channels: Systemkanal, sonst der erste Textkanal, in den der Bot schreiben darf
+        if guild.system_channel and guild.system_channel.permissions_for(guild.me).send_messages:
+            return guild.system_channel
+        for channel in guild.text_channels:
+            if channel.permissions_for(guild.me).send_messages:
+                return channel
+        return None
+
+    async def run_twitch_add(self, job_id, kind, payload):
+        twitch = self.require_cog("TwitchAlertsCog")
+        guild = self.bot.get_guild(payload["guild_id"])
+        if guild is None:
+            raise RuntimeError(f"Server {payload['guild_id']} nicht gefunden")
+        channel = self.alert_channel(guild)
+        if channel is None:
+            raise RuntimeError(f"Kein Textkanal in {guild.name}, in den der Bot schreiben darf")
+
+        logins = payload["logins"]
+        added = []
+        done = 0
+        for batch in batches(logins):
+            added += await twitch.add_streamers(guild.id, batch, channel.id, None)
+            done += len(batch)
+            await self.queue.progress(job_id, done)
+            await asyncio.sleep(0)
+
+        return (
+            f"{len(added)} Streamer in #{channel.name} hinzugefügt, {len(logins) - len(added)} bereits überwacht"
+            + skipped_note(payload.get("skipped"))
+        )
+
+async def setup(bot):
+    await bot.add_cog(AdminJobsCog(bot))
+    await bot.log("AdminJobsCog geladen.", "SUCCESS")
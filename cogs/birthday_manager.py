@@ -1,34 +1,37 @@
 # cogs/birthday_manager.py
 import discord
-from discord.ext import commands, tasks
-import json
-import os
+from discord.ext import commands
 from datetime import datetime, timedelta
-import asyncio
-import aiosqlite
+import time
+from core.birthdays import BirthdayStore
+from core.concurrency import bounded_gather
+from core.scheduler import daily_at, weekly_at
+
+BIRTHDAY_LIST_LIMIT = 25  # Discord erlaubt maximal 25 Felder pro Embed
+ROLE_UPDATE_CONCURRENCY = 5  # Gleichzeitige Rollen-Requests; Discord drosselt sonst mit 429
+MESSAGE_LIMIT = 2000  # Zeichen pro Discord-Nachricht
+
+def chunk_messages(parts, limit=MESSAGE_LIMIT, separator="\n\n"):
+    # Teile zu möglichst wenigen Nachrichten zusammenfassen, jede unter dem Zeichenlimit
+    chunks = []
+    current = ""
+    for part in parts:
+        candidate = f"{current}{separator}{part}" if current else part
+        if current and len(candidate) > limit:
+            chunks.append(current)
+            candidate = part
+        current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
 
 class BirthdayManagerCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.allowed_channel_id = self.bot.config["channels"]["birthday"]
         self.birthday_role_id = self.bot.config["roles"]["birthday"]
-        self.birthdays_file = "birthdays.json"
+        self.store = BirthdayStore(self.bot.db)
         self.milestone_ages = {18, 21, 30, 40, 50, 60, 70, 80, 90, 100}
-        self.ensure_file_exists()
-
-    def ensure_file_exists(self):
-        if not os.path.exists(self.birthdays_file):
-            with open(self.birthdays_file, "w", encoding="utf-8") as f:
-                json.dump({}, f, indent=4)
-            asyncio.create_task(self.bot.log("birthdays.json erstellt.", "INFO"))
-
-    def load_birthdays(self):
-        with open(self.birthdays_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-
-    def save_birthdays(self, data):
-        with open(self.birthdays_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
 
     def check_channel(self, ctx):
         if ctx.channel.id != self.allowed_channel_id:
@@ -57,12 +60,8 @@ class BirthdayManagerCog(commands.Cog):
             await ctx.send("❌ Ungültiges Format! Verwende `DD.MM.JJJJ` (z. B. `24.12.1995`)")
             return
 
-        birthdays = self.load_birthdays()
-        birthdays[str(ctx.author.id)] = {
-            "name": ctx.author.display_name,
-            "date": f"{day:02d}.{month:02d}.{year:04d}"
-        }
-        self.save_birthdays(birthdays)
+        await self.store.set(ctx.author.id, ctx.author.display_name, day, month, year)
+        self.bot.dashboard.mark_dirty()
 
         await ctx.send(f"✅ {ctx.author.mention}, dein Geburtstag **{day:02d}.{month:02d}.{year:04d}** wurde gespeichert!")
         await self.bot.log(f"{ctx.author} hat Geburtstag auf {day:02d}.{month:02d}.{year:04d} gesetzt.", "INFO")
@@ -70,24 +69,19 @@ class BirthdayManagerCog(commands.Cog):
     @birthday.command(name="me")
     async def birthday_me(self, ctx):
         self.check_channel(ctx)
-        birthdays = self.load_birthdays()
-        user_id = str(ctx.author.id)
+        entry = self.store.get(ctx.author.id)
 
-        if user_id not in birthdays:
+        if not entry:
             await ctx.send("❌ Du hast noch keinen Geburtstag eingetragen!")
             return
 
-        bday_str = birthdays[user_id]["date"]
-        day, month, year = map(int, bday_str.split("."))
+        bday_str = entry["date"]
         today = datetime.utcnow().date()
-        birth_date = datetime(year=year, month=month, day=day).date()
-        age = today.year - birth_date.year
-        if (today.month, today.day) < (birth_date.month, birth_date.day):
+        age = today.year - entry["year"]
+        if (today.month, today.day) < (entry["month"], entry["day"]):
             age -= 1
 
-        this_year_bday = today.replace(year=today.year, month=month, day=day)
-        next_bday = this_year_bday if this_year_bday >= today else today.replace(year=today.year + 1, month=month, day=day)
-        days_left = (next_bday - today).days
+        days_left = (self.store.next_birthday(ctx.author.id, today) - today).days
 
         if days_left == 0:
             await ctx.send(f"🎉 HEUTE IST DEIN GEBURTSTAG, {ctx.author.mention}! 🎂 Alles Gute!\n Du bist jetzt **{age} Jahre** alt!")
@@ -97,157 +91,182 @@ class BirthdayManagerCog(commands.Cog):
     @birthday.command(name="list")
     async def birthday_list(self, ctx):
         self.check_channel(ctx)
-        birthdays = self.load_birthdays()
-        if not birthdays:
+        if not len(self.store):
             await ctx.send("ℹ️ Noch keine Geburtstage eingetragen.")
             return
 
-        sorted_birthdays = sorted(
-            birthdays.items(),
-            key=lambda x: (int(x[1]["date"].split(".")[1]), int(x[1]["date"].split(".")[0]))
-        )
+        sorted_birthdays = self.store.calendar_order()
+        shown = sorted_birthdays[:BIRTHDAY_LIST_LIMIT]
 
+        names = await self.bot.names.resolve_many(
+            [user_id for user_id, _ in shown],
+            {user_id: data["name"] for user_id, data in shown}
+        )
         embed = discord.Embed(title="🎂 Geburtstagskalender", color=0xFF69B4)
-        for user_id, data in sorted_birthdays:
-            user = self.bot.get_user(int(user_id)) or await self.bot.fetch_user(int(user_id))
-            name = user.display_name if user else data["name"]
-            embed.add_field(name=data["date"], value=name, inline=True)
+        for user_id, data in shown:
+            embed.add_field(name=data["date"], value=names[user_id], inline=True)
+        if len(sorted_birthdays) > len(shown):
+            embed.set_footer(text=f"… und {len(sorted_birthdays) - len(shown)} weitere")
 
         await ctx.send(embed=embed)
 
-    @tasks.loop(minutes=1)
-    async def weekly_birthday_preview(self):
-        now = datetime.utcnow()
-        if now.weekday() == 0 and now.hour == 8 and now.minute == 0:
-            today = now.date()
-            week_end = today + timedelta(days=6)
-            birthdays = self.load_birthdays()
-            upcoming = []
-
-            for user_id_str, data in birthdays.items():
-                day, month, year = map(int, data["date"].split("."))
-                this_year_bday = today.replace(month=month, day=day)
-                next_bday = this_year_bday if this_year_bday >= today else today.replace(year=today.year + 1, month=month, day=day)
-                if today <= next_bday <= week_end:
-                    user = self.bot.get_user(int(user_id_str)) or await self.bot.fetch_user(int(user_id_str))
-                    name = user.display_name if user else data["name"]
-                    upcoming.append((next_bday, name, data["date"], user_id_str))
-
-            upcoming.sort(key=lambda x: x[0])
-            channel = self.bot.get_channel(self.allowed_channel_id)
-            if not channel:
-                return
-
-            if not upcoming:
-                await channel.send("ℹ️ **Diese Woche hat niemand Geburtstag.** 🎂")
-                return
-
-            embed = discord.Embed(
-                title="📅 Geburtstage diese Woche",
-                color=0xFF69B4,
-                description="Notiere dir die Termine — lass uns gemeinsam feiern! 🎉"
-            )
-            for date_obj, name, date_str, user_id in upcoming:
-                days_until = (date_obj - today).days
-                when = "🎉 HEUTE!" if days_until == 0 else f"in {days_until} Tagen"
-                embed.add_field(name=f"{date_str} — {name}", value=when, inline=False)
-
-            await channel.send(embed=embed)
-            await self.bot.log("Wöchentliche Geburtstagsvorschau gepostet.", "INFO")
-
-    @tasks.loop(minutes=1)
-    async def check_birthday_actions(self):
-        now = datetime.utcnow()
-        birthdays = self.load_birthdays()
-
-        if now.hour == 8 and now.minute == 0:
-            today_str = f"{now.day:02d}.{now.month:02d}"
-            celebrants = []
-
-            for user_id_str, data in birthdays.items():
-                bday_parts = data["date"].split(".")
-                bday_day_month = f"{bday_parts[0]}.{bday_parts[1]}"
-                if bday_day_month == today_str:
-                    user_id = int(user_id_str)
-                    for guild in self.bot.guilds:
-                        member = guild.get_member(user_id)
-                        if member:
-                            day, month, year = map(int, data["date"].split("."))
-                            birth_date = datetime(year=year, month=month, day=day).date()
-                            today = now.date()
-                            age = today.year - birth_date.year
-                            if (today.month, today.day) < (birth_date.month, birth_date.day):
-                                age -= 1
-
-                            coins_to_give = 200
-                            if age in self.milestone_ages:
-                                coins_to_give += 500
-                                await self.bot.log(f"{member.display_name} erhält Bonus-Coins für {age}. Geburtstag!", "SUCCESS")
-
-                            try:
-                                async with aiosqlite.connect("economy.db") as db:
-                                    await db.execute(
-                                        "INSERT INTO coins (user_id, balance) VALUES (?, ?) ON CONFLICT(user_id) DO UPDATE SET balance = balance + ?",
-                                        (user_id, coins_to_give, coins_to_give)
-                                    )
-                                    await db.commit()
-                            except Exception as e:
-                                await self.bot.log(f"Fehler beim Coins-Gutschreiben für {member.display_name}: {e}", "ERROR")
-
-                            role = guild.get_role(self.birthday_role_id)
-                            if role and role not in member.roles:
-                                try:
-                                    await member.add_roles(role)
-                                except discord.Forbidden:
-                                    await self.bot.log(f"Keine Rechte, Rolle in {guild.name} zu vergeben.", "ERROR")
-                            celebrants.append((member, age, coins_to_give))
-
-            if celebrants:
-                channel = self.bot.get_channel(self.allowed_channel_id)
-                if channel:
-                    messages = []
-                    for member, age, coins in celebrants:
-                        msg = f"🎉 **ALLES GUTE ZUM {age}. GEBURTSTAG, {member.mention}!** 🎂\n🎁 **+{coins} Coins** wurden dir gutgeschrieben!\n👑 Du hast die **Geburtstags-Rolle** erhalten!"
-                        messages.append(msg)
-                    await channel.send("\n\n".join(messages))
-                    await self.bot.log(f"Gratulation an {len(celebrants)} User gesendet.", "SUCCESS")
+    async def weekly_birthday_preview(self, run_time):
+        today = run_time.date()
+        upcoming = self.store.upcoming(today, 7)
+
+        names = await self.bot.names.resolve_many(
+            [user_id for _, user_id, _ in upcoming],
+            {user_id: data["name"] for _, user_id, data in upcoming}
+        )
+        upcoming = [(date_obj, names[user_id], data["date"], user_id) for date_obj, user_id, data in upcoming]
+        channel = self.bot.get_channel(self.allowed_channel_id)
+        if not channel:
+            return
+
+        if not upcoming:
+            await channel.send("ℹ️ **Diese Woche hat niemand Geburtstag.** 🎂")
+            return
 
-        elif now.hour == 23 and now.minute == 59:
+        embed = discord.Embed(
+            title="📅 Geburtstage diese Woche",
+            color=0xFF69B4,
+            description="Notiere dir die Termine — lass uns gemeinsam feiern! 🎉"
+        )
+        for date_obj, name, date_str, user_id in upcoming:
+            days_until = (date_obj - today).days
+            when = "🎉 HEUTE!" if days_until == 0 else f"in {days_until} Tagen"
+            embed.add_field(name=f"{date_str} — {name}", value=when, inline=False)
+
+        await channel.send(embed=embed)
+        await self.bot.log("Wöchentliche Geburtstagsvorschau gepostet.", "INFO")
+
+    async def celebrate_birthdays(self, run_time):
+        started = time.monotonic()
+        today = run_time.date()
+        payouts = {}  # user_id -> (alter, coins) — pro User nur einmal, auch bei mehreren Servern
+        role_targets = []
+        celebrants = []
+
+        for user_id in self.store.on_date(today):
+            data = self.store.get(user_id)
             for guild in self.bot.guilds:
-                role = guild.get_role(self.birthday_role_id)
-                if not role:
+                member = guild.get_member(user_id)
+                if not member:
                     continue
-                for member in role.members:
-                    try:
-                        await member.remove_roles(role)
-                    except discord.Forbidden:
-                        await self.bot.log(f"Keine Rechte, Rolle von {member.display_name} in {guild.name} zu entfernen.", "ERROR")
+                if user_id not in payouts:
+                    age = today.year - data["year"]
+                    coins_to_give = 200
+                    if age in self.milestone_ages:
+                        coins_to_give += 500
+                        await self.bot.log(f"{member.display_name} erhält Bonus-Coins für {age}. Geburtstag!", "SUCCESS")
+                    payouts[user_id] = (age, coins_to_give)
+                    celebrants.append((member, age, coins_to_give))
 
-    @commands.Cog.listener()
-    async def on_member_remove(self, member):
-        user_id = str(member.id)
-        birthdays = self.load_birthdays()
-        if user_id in birthdays:
-            del birthdays[user_id]
-            self.save_birthdays(birthdays)
-            await self.bot.log(f"{member.display_name} ({member.id}) aus birthdays.json entfernt (Server verlassen).", "INFO")
+                role = guild.get_role(self.birthday_role_id)
+                if role and role not in member.roles:
+                    role_targets.append((member, role))
+
+        if not payouts:
+            return
+
+        # Alle Gutschriften in einer Transaktion; die Auszahlungs-Zeile pro (User, Jahr) macht einen Wiederholungslauf
+        # nach Neustart oder Fehler harmlos — wer schon bezahlt wurde, wird übersprungen
+        paid = set()
+        try:
+            async with self.bot.wallet.booking("birthday") as booking:
+                for user_id, (_, coins_to_give) in payouts.items():
+                    cursor = await booking.db.execute(
+                        "INSERT OR IGNORE INTO birthday_payouts (user_id, year) VALUES (?, ?)",
+                        (user_id, today.year)
+                    )
+                    if cursor.rowcount:
+                        await booking.credit(user_id, coins_to_give)
+                        paid.add(user_id)
+        except Exception as e:
+            await self.bot.log(f"Fehler beim Coins-Gutschreiben für {len(payouts)} Geburtstagskinder: {e}", "ERROR")
+            raise
+        celebrants = [entry for entry in celebrants if entry[0].id in paid]
+
+        results = await bounded_gather((member.add_roles(role) for member, role in role_targets), ROLE_UPDATE_CONCURRENCY)
+        failures = 0
+        for (member, role), result in zip(role_targets, results):
+            if isinstance(result, Exception):
+                failures += 1
+                if isinstance(result, discord.Forbidden):
+                    await self.bot.log(f"Keine Rechte, Rolle in {member.guild.name} zu vergeben.", "ERROR")
+                else:
+                    await self.bot.log(f"Rolle konnte {member.display_name} nicht vergeben werden: {result}", "ERROR")
+
+        if celebrants:
+            channel = self.bot.get_channel(self.allowed_channel_id)
+            if channel:
+                messages = []
+                for member, age, coins in celebrants:
+                    msg = f"🎉 **ALLES GUTE ZUM {age}. GEBURTSTAG, {member.mention}!** 🎂\n🎁 **+{coins} Coins** wurden dir gutgeschrieben!\n👑 Du hast die **Geburtstags-Rolle** erhalten!"
+                    messages.append(msg)
+                # Die Coins sind gebucht — ein Sendefehler darf den Lauf nicht mehr abbrechen
+                try:
+                    for chunk in chunk_messages(messages):
+                        await channel.send(chunk)
+                    await self.bot.log(f"Gratulation an {len(celebrants)} User gesendet.", "SUCCESS")
+                except discord.HTTPException as e:
+                    await self.bot.log(f"Gratulation konnte nicht gesendet werden: {e}", "ERROR")
+
+        await self.bot.log(
+            f"Geburtstagsjob: {len(paid)} User bezahlt, {len(role_targets) - failures}/{len(role_targets)} Rollen vergeben, "
+            f"{failures} Fehler in {time.monotonic() - started:.2f}s.",
+            "WARNING" if failures else "INFO"
+        )
+
+    async def remove_birthday_roles(self, run_time):
+        started = time.monotonic()
+        targets = []
+        for guild in self.bot.guilds:
+            role = guild.get_role(self.birthday_role_id)
+            if not role:
+                continue
+            targets.extend((member, role) for member in role.members)
+
+        if not targets:
+            return
 
-    @weekly_birthday_preview.before_loop
-    async def before_weekly_birthday_preview(self):
-        await self.bot.wait_until_ready()
+        results = await bounded_gather((member.remove_roles(role) for member, role in targets), ROLE_UPDATE_CONCURRENCY)
+        failures = 0
+        for (member, role), result in zip(targets, results):
+            if isinstance(result, Exception):
+                failures += 1
+                if isinstance(result, discord.Forbidden):
+                    await self.bot.log(f"Keine Rechte, Rolle von {member.display_name} in {member.guild.name} zu entfernen.", "ERROR")
+                else:
+                    await self.bot.log(f"Rolle von {member.display_name} konnte nicht entfernt werden: {result}", "ERROR")
+
+        await self.bot.log(
+            f"Geburtstagsrollen entfernt: {len(targets) - failures}/{len(targets)}, {failures} Fehler in {time.monotonic() - started:.2f}s.",
+            "WARNING" if failures else "INFO"
+        )
 
-    @check_birthday_actions.before_loop
-    async def before_check_birthday_actions(self):
-        await self.bot.wait_until_ready()
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        if await self.store.remove(member.id):
+            self.bot.dashboard.mark_dirty()
+            await self.bot.log(f"{member.display_name} ({member.id}) aus dem Geburtstagskalender entfernt (Server verlassen).", "INFO")
 
     async def cog_load(self):
-        self.weekly_birthday_preview.start()
-        self.check_birthday_actions.start()
+        await self.bot.db.execute(
+            "economy.db",
+            "CREATE TABLE IF NOT EXISTS birthday_payouts (user_id INTEGER NOT NULL, year INTEGER NOT NULL, PRIMARY KEY (user_id, year))"
+        )
+        migrated = await self.store.load()
+        if migrated:
+            await self.bot.log(f"{migrated} Geburtstage aus birthdays.json übernommen.", "INFO")
+        await self.bot.scheduler.schedule("birthday_celebration", daily_at(8), self.celebrate_birthdays, catch_up=timedelta(hours=15))
+        await self.bot.scheduler.schedule("birthday_role_removal", daily_at(23, 59), self.remove_birthday_roles, catch_up=timedelta(hours=8))
+        await self.bot.scheduler.schedule("birthday_weekly_preview", weekly_at(0, 8), self.weekly_birthday_preview, catch_up=timedelta(days=1))
         await self.bot.log("BirthdayManagerCog geladen.", "SUCCESS")
 
     async def cog_unload(self):
-        self.weekly_birthday_preview.cancel()
-        self.check_birthday_actions.cancel()
+        for job in ("birthday_celebration", "birthday_role_removal", "birthday_weekly_preview"):
+            self.bot.scheduler.cancel(job)
 
 async def setup(bot):
     await bot.add_cog(BirthdayManagerCog(bot))
\ No newline at end of file
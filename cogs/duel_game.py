@@ -1,26 +1,53 @@
 # cogs/duel_game.py
 import discord
 from discord.ext import commands
-import aiosqlite
 import random
-import asyncio
+from itertools import count
+from core.games import GameCog, Outcome
+from core.timer_wheel import TimerWheel
+
+DUEL_TIMEOUT = 60  # Sekunden, bis eine offene Herausforderung verfällt
+
+class DuelChallengeView(discord.ui.View):
+    def __init__(self, cog, duel_id):
+        # Kein eigener View-Timeout — das Timer-Rad des Cogs räumt ab
+        super().__init__(timeout=None)
+        self.cog = cog
+        self.duel_id = duel_id
+
+    @discord.ui.button(label="Annehmen", emoji="⚔️", style=discord.ButtonStyle.success)
+    async def accept(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.cog.accept_duel(interaction, self.duel_id)
+
+    @discord.ui.button(label="Ablehnen", style=discord.ButtonStyle.secondary)
+    async def decline(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.cog.decline_duel(interaction, self.duel_id)
+
+class DuelGameCog(GameCog):
+    # Zwei Spieler mit Annahme per Button — statt play() eigener Ablauf, aber resolve/render und die gemeinsame Buchung (settle_players)
+    game = "duel"
+    label = "Duell"
+    title = "🎲 WÜRFELDUELL"
+    color = 0xFF4500
+    channel_key = "duel"
 
-class DuelGameCog(commands.Cog):
     def __init__(self, bot):
-        self.bot = bot
-        self.allowed_channel_id = self.bot.config["channels"]["duel"]
+        super().__init__(bot)
+        self.challenges = {}  # duel_id -> offene Herausforderung (noch ohne Einsatz)
+        self.pairs = {}  # (challenger_id, opponent_id) -> duel_id
+        self.timers = TimerWheel()
+        self.duel_ids = count(1)
 
-    def check_channel(self, ctx):
-        if ctx.channel.id != self.allowed_channel_id:
-            raise commands.CheckFailure(f"❌ Dieser Befehl ist nur im <#{self.allowed_channel_id}> erlaubt!")
-        return True
+    def cog_unload(self):
+        self.timers.close()
+        for challenge in self.challenges.values():
+            challenge["view"].stop()
+        self.challenges.clear()
+        self.pairs.clear()
 
     @commands.group(name="duel", invoke_without_command=True)
     async def duel(self, ctx):
-        if ctx.channel.id != self.allowed_channel_id:
-            await ctx.send(f"ℹ️ Nur im <#{self.allowed_channel_id}> verfügbar!")
-            return
-        await ctx.send("Verwende `.duel challenge @user <einsatz>`")
+        await self.send_usage(ctx, "Verwende `.duel challenge @user <einsatz>`")
 
     @duel.command(name="challenge")
     async def duel_challenge(self, ctx, opponent: discord.Member, bet: int):
@@ -34,61 +61,119 @@ class DuelGameCog(commands.Cog):
         if bet <= 0:
             await ctx.send("❌ Der Einsatz muss mindestens 1 Coin betragen!")
             return
+        if (ctx.author.id, opponent.id) in self.pairs:
+            await ctx.send(f"⏳ Du hast {opponent.mention} bereits herausgefordert!")
+            return
+        if await self.check_rate(ctx):
+            return
+
+        # Vorabprüfung aus dem Index; verbindlich abgebucht wird erst bei Annahme
+        balance = self.bot.leaderboards.coins.get(ctx.author.id)
+        if not balance or balance[0] < bet:
+            await ctx.send("❌ Du hast nicht genug Coins!")
+            return
+
+        duel_id = next(self.duel_ids)
+        view = DuelChallengeView(self, duel_id)
+        message = await ctx.send(
+            f"🎲 {ctx.author.mention} fordert {opponent.mention} zu einem **Würfelduell** mit **{bet} Coins** Einsatz heraus!\n"
+            f"⏱️ {opponent.display_name}, du hast {DUEL_TIMEOUT} Sekunden Zeit, um anzunehmen.",
+            view=view
+        )
+        self.challenges[duel_id] = {
+            "challenger": ctx.author,
+            "opponent": opponent,
+            "bet": bet,
+            "message": message,
+            "view": view
+        }
+        self.pairs[(ctx.author.id, opponent.id)] = duel_id
+        self.timers.schedule(duel_id, DUEL_TIMEOUT, lambda: self.expire_duel(duel_id))
+
+    def pop_challenge(self, duel_id):
+        challenge = self.challenges.pop(duel_id, None)
+        if challenge:
+            self.timers.cancel(duel_id)
+            self.pairs.pop((challenge["challenger"].id, challenge["opponent"].id), None)
+            # Ohne stop() bleibt der View (timeout=None) samt Cog-Referenz für immer im ViewStore von discord.py
+            challenge["view"].stop()
+        return challenge
+
+    async def expire_duel(self, duel_id):
+        challenge = self.pop_challenge(duel_id)
+        if not challenge:
+            return
+        try:
+            await challenge["message"].edit(content=f"⌛ Die Herausforderung an {challenge['opponent'].mention} ist abgelaufen.", view=None)
+        except discord.HTTPException:
+            pass
+
+    async def decline_duel(self, interaction, duel_id):
+        challenge = self.challenges.get(duel_id)
+        if not challenge:
+            await interaction.response.send_message("❌ Diese Herausforderung ist nicht mehr offen.", ephemeral=True)
+            return
+        if interaction.user.id not in (challenge["challenger"].id, challenge["opponent"].id):
+            await interaction.response.send_message("❌ Dieses Duell betrifft dich nicht.", ephemeral=True)
+            return
+        self.pop_challenge(duel_id)
+        await interaction.response.edit_message(content=f"🏳️ {interaction.user.mention} hat das Duell abgesagt.", view=None)
+
+    async def accept_duel(self, interaction, duel_id):
+        challenge = self.challenges.get(duel_id)
+        if not challenge:
+            await interaction.response.send_message("❌ Diese Herausforderung ist nicht mehr offen.", ephemeral=True)
+            return
+        if interaction.user.id != challenge["opponent"].id:
+            await interaction.response.send_message("❌ Nur der Herausgeforderte kann annehmen.", ephemeral=True)
+            return
+        # Vor dem ersten await entfernen, damit ein Doppelklick nicht zweimal abrechnet
+        self.pop_challenge(duel_id)
+        challenger, opponent, bet = challenge["challenger"], challenge["opponent"], challenge["bet"]
+        outcome = self.resolve(bet, challenger, opponent)
 
-        async with aiosqlite.connect("economy.db") as db:
-            for user in [ctx.author, opponent]:
-                cursor = await db.execute("SELECT balance FROM coins WHERE user_id = ?", (user.id,))
-                row = await cursor.fetchone()
-                balance = row[0] if row else 0
-                if balance < bet:
-                    await ctx.send(f"❌ {user.mention} hat nicht genug Coins!")
-                    return
+        # Antwort sofort bestätigen — wartet die Buchung auf einen belegten economy.db-Lock, wäre sonst die 3-Sekunden-Frist weg
+        await interaction.response.defer()
 
-            for user in [ctx.author, opponent]:
-                await db.execute("UPDATE coins SET balance = balance - ? WHERE user_id = ?", (bet, user.id))
-            await db.commit()
+        # Beide Einsätze und die Auszahlung in einer Buchung — reicht ein Kontostand nicht, wird nichts gebucht
+        broke_id = await self.settle_players({challenger.id: bet, opponent.id: bet}, outcome.payout)
+        if broke_id is not None:
+            broke_user = challenger if broke_id == challenger.id else opponent
+            await interaction.edit_original_response(content=f"❌ {broke_user.mention} hat nicht genug Coins! Das Duell fällt aus.", view=None)
+            return
 
-        await ctx.send(f"🎲 {ctx.author.mention} fordert {opponent.mention} zu einem **Würfelduell** mit **{bet} Coins** Einsatz heraus!")
-        await asyncio.sleep(3)
-        await ctx.send(f"{opponent.mention}, du wurdest herausgefordert! Der Kampf beginnt...")
+        embed = discord.Embed(title=self.title, color=self.color)
+        self.render(embed, bet, outcome)
+        winner = outcome.details[4]
+        if winner:
+            await self.bot.log(f"{winner} hat das Duell gegen {opponent if winner == challenger else challenger} gewonnen ({bet * 2} Coins).", "SUCCESS")
+        else:
+            await self.bot.log(f"Duell zwischen {challenger} und {opponent} endete unentschieden.", "INFO")
 
+        await interaction.edit_original_response(
+            content=f"⚔️ {opponent.mention} hat die Herausforderung von {challenger.mention} angenommen!",
+            embed=embed,
+            view=None
+        )
+
+    def resolve(self, bet, challenger, opponent):
         player1_roll = random.randint(1, 20)
         player2_roll = random.randint(1, 20)
+        winner = challenger if player1_roll > player2_roll else opponent if player2_roll > player1_roll else None
+        # Sieger bekommt den Pot, bei Gleichstand gibt es je den halben Einsatz zurück
+        payouts = {winner.id: bet * 2} if winner else {challenger.id: bet // 2, opponent.id: bet // 2}
+        return Outcome(payouts, (challenger, opponent, player1_roll, player2_roll, winner))
 
-        embed = discord.Embed(title="🎲 WÜRFELDUELL", color=0xFF4500)
-        embed.add_field(name=ctx.author.display_name, value=f"🎲 **{player1_roll}**", inline=True)
+    def render(self, embed, bet, outcome):
+        challenger, opponent, player1_roll, player2_roll, winner = outcome.details
+        embed.add_field(name=challenger.display_name, value=f"🎲 **{player1_roll}**", inline=True)
         embed.add_field(name=opponent.display_name, value=f"🎲 **{player2_roll}**", inline=True)
-
-        winner = None
-        if player1_roll > player2_roll:
-            winner = ctx.author
-        elif player2_roll > player1_roll:
-            winner = opponent
+        if winner:
+            embed.add_field(name="🏆 GEWINNER", value=f"{winner.mention} gewinnt **{bet * 2} Coins**!", inline=False)
+            embed.color = 0x00FF00
         else:
             embed.add_field(name="⚔️ UNENTSCHIEDEN", value="Der Einsatz wird zur Hälfte zurückerstattet!", inline=False)
-            async with aiosqlite.connect("economy.db") as db:
-                for user in [ctx.author, opponent]:
-                    refund = bet // 2
-                    await db.execute(
-                        "INSERT INTO coins (user_id, balance) VALUES (?, ?) ON CONFLICT(user_id) DO UPDATE SET balance = balance + ?",
-                        (user.id, refund, refund)
-                    )
-                await db.commit()
             embed.color = 0xFFFF00
-            await self.bot.log(f"Duell zwischen {ctx.author} und {opponent} endete unentschieden.", "INFO")
-        if winner:
-            total_pot = bet * 2
-            embed.add_field(name="🏆 GEWINNER", value=f"{winner.mention} gewinnt **{total_pot} Coins**!", inline=False)
-            async with aiosqlite.connect("economy.db") as db:
-                await db.execute(
-                    "INSERT INTO coins (user_id, balance) VALUES (?, ?) ON CONFLICT(user_id) DO UPDATE SET balance = balance + ?",
-                    (winner.id, total_pot, total_pot)
-                )
-                await db.commit()
-            embed.color = 0x00FF00
-            await self.bot.log(f"{winner} hat das Duell gegen {opponent if winner == ctx.author else ctx.author} gewonnen ({total_pot} Coins).", "SUCCESS")
-
-        await ctx.send(embed=embed)
 
 async def setup(bot):
     await bot.add_cog(DuelGameCog(bot))
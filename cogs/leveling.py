@@ -1,18 +1,25 @@
 # cogs/leveling.py
 import discord
-from discord.ext import commands
-import aiosqlite
+from discord.ext import commands, tasks
+import asyncio
 import random
-from datetime import datetime
+from datetime import datetime, timedelta
+from core.levels import CURVE_VERSION, level_for_xp, progress, recompute_levels
+
+# Write-Behind-Puffer: XP-Gewinne werden gesammelt und gebündelt geschrieben
+XP_FLUSH_INTERVAL = 30  # Sekunden
+XP_FLUSH_THRESHOLD = 500  # Anzahl gepufferter User, ab der sofort geschrieben wird
 
 class LevelingCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.cooldowns = {}
         self.levelup_channel_id = self.bot.config["channels"]["levelup"]
+        self.xp_cache = {}  # user_id -> [xp, level] (Stand inkl. ungeschriebener Gewinne)
+        self.pending_xp = {}  # user_id -> [xp_delta, level, last_message]
+        self.flush_lock = asyncio.Lock()
 
     async def cog_load(self):
-        async with aiosqlite.connect("leveling.db") as db:
+        async with self.bot.db.transaction("leveling.db") as db:
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS users (
                     user_id INTEGER PRIMARY KEY,
@@ -21,8 +28,99 @@ class LevelingCog(commands.Cog):
                     last_message DATETIME
                 )
             """)
-            await db.commit()
+            # Ältere Datenbanken haben noch keine last_message-Spalte
+            cursor = await db.execute("PRAGMA table_info(users)")
+            columns = {row[1] for row in await cursor.fetchall()}
+            if "last_message" not in columns:
+                await db.execute("ALTER TABLE users ADD COLUMN last_message DATETIME")
+        await self.migrate_curve()
+        await self.bot.leaderboards.load_levels()
+        await self.load_cooldowns()
         await self.bot.log("LevelingCog: Datenbanktabelle erstellt.", "INFO")
+        self.flush_xp_buffer.start()
+
+    async def cog_unload(self):
+        self.flush_xp_buffer.cancel()
+        await self.flush_xp()
+
+    async def migrate_curve(self):
+        # Nach einer Änderung der Levelkurve alle Level in einem Durchgang neu berechnen
+        row = await self.bot.db.fetchone("leveling.db", "PRAGMA user_version")
+        if row[0] == CURVE_VERSION:
+            return
+        changed = await recompute_levels(self.bot.db)
+        await self.bot.db.execute("leveling.db", f"PRAGMA user_version = {CURVE_VERSION}")
+        self.xp_cache.clear()
+        await self.bot.log(f"Levelkurve v{CURVE_VERSION}: {changed} Level neu berechnet.", "INFO")
+
+    async def load_cooldowns(self):
+        # Nur User, deren letzte XP-Vergabe noch im Cooldown liegt — der Rest braucht keinen Eintrag
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=self.bot.limiter.refill_time("xp"))
+        rows = await self.bot.db.fetchall(
+            "leveling.db",
+            "SELECT user_id, last_message FROM users WHERE last_message >= ?",
+            (cutoff.isoformat(),)
+        )
+        for user_id, last_message in rows:
+            try:
+                seconds_ago = (now - datetime.fromisoformat(last_message)).total_seconds()
+            except (TypeError, ValueError):
+                continue
+            self.bot.limiter.seed("xp", user_id, max(0, seconds_ago))
+
+    @tasks.loop(seconds=XP_FLUSH_INTERVAL)
+    async def flush_xp_buffer(self):
+        await self.flush_xp()
+
+    async def flush_xp(self):
+        async with self.flush_lock:
+            if not self.pending_xp:
+                return
+            batch, self.pending_xp = self.pending_xp, {}
+            rows = [(user_id, delta, level, last_message) for user_id, (delta, level, last_message) in batch.items()]
+            try:
+                await self.bot.db.executemany(
+                    "leveling.db",
+                    "INSERT INTO users (user_id, xp, level, last_message) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(user_id) DO UPDATE SET xp = xp + excluded.xp, level = excluded.level, last_message = excluded.last_message",
+                    rows
+                )
+            except Exception as e:
+                # Nicht geschriebene Gewinne zurück in den Puffer legen
+                for user_id, (delta, level, last_message) in batch.items():
+                    pending = self.pending_xp.get(user_id)
+                    if pending:
+                        pending[0] += delta
+                    else:
+                        self.pending_xp[user_id] = [delta, level, last_message]
+                await self.bot.log(f"LevelingCog: XP-Puffer konnte nicht geschrieben werden: {e}", "ERROR")
+
+    async def reset_users(self, user_ids, delete=False):
+        # XP auf 0 (oder User löschen) — unter dem Flush-Lock, damit kein gepufferter Gewinn danach wieder auftaucht.
+        # Liefert die Anzahl tatsächlich geänderter Zeilen
+        async with self.flush_lock:
+            if delete:
+                sql = "DELETE FROM users WHERE user_id = ?"
+            else:
+                sql = "UPDATE users SET xp = 0, level = 1 WHERE user_id = ? AND (xp != 0 OR level != 1)"
+            changed = await self.bot.db.executemany("leveling.db", sql, [(user_id,) for user_id in user_ids])
+            for user_id in user_ids:
+                self.pending_xp.pop(user_id, None)
+                self.xp_cache.pop(user_id, None)
+                if delete:
+                    self.bot.leaderboards.levels.remove(user_id)
+                elif self.bot.leaderboards.levels.get(user_id) is not None:
+                    self.bot.leaderboards.levels.update(user_id, 0, 1)
+        return changed
+
+    def get_cached_xp(self, user_id):
+        entry = self.xp_cache.get(user_id)
+        if entry is None:
+            # Der Rang-Index hält bereits den Stand aller User
+            row = self.bot.leaderboards.levels.get(user_id)
+            entry = self.xp_cache.setdefault(user_id, list(row) if row else [0, 1])
+        return entry
 
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -30,78 +128,77 @@ class LevelingCog(commands.Cog):
             return
 
         user_id = message.author.id
+        # Cooldown im Speicher: Nachrichten innerhalb des Cooldowns kosten keinen Datenbankzugriff
+        if self.bot.limiter.hit("xp", user_id):
+            return
         now = datetime.utcnow()
 
         xp_gain = random.randint(5, 15)
 
-        async with aiosqlite.connect("leveling.db") as db:
-            cursor = await db.execute("SELECT xp, level FROM users WHERE user_id = ?", (user_id,))
-            row = await cursor.fetchone()
-
-            if not row:
-                await db.execute("INSERT INTO users (user_id, xp, level, last_message) VALUES (?, ?, ?, ?)", (user_id, xp_gain, 1, now.isoformat()))
-                new_xp = xp_gain
-                new_level = 1
-            else:
-                current_xp, current_level = row
-                new_xp = current_xp + xp_gain
-                new_level = int(new_xp ** 0.5 / 10) + 1
-
-                if new_level > current_level:
-                    levelup_channel = self.bot.get_channel(self.levelup_channel_id)
-                    if levelup_channel:
-                        try:
-                            await levelup_channel.send(f"🎉 **Level Up!** {message.author.mention} ist jetzt Level **{new_level}**!")
-                        except Exception as e:
-                            await self.bot.log(f"Konnte nicht in LevelUp-Channel senden: {e}", "ERROR")
-
-                await db.execute("UPDATE users SET xp = ?, level = ?, last_message = ? WHERE user_id = ?", (new_xp, new_level, now.isoformat(), user_id))
-            await db.commit()
+        entry = self.get_cached_xp(user_id)
+        current_xp, current_level = entry
+        new_xp = current_xp + xp_gain
+        new_level = level_for_xp(new_xp)
+        entry[0], entry[1] = new_xp, new_level
+        self.bot.leaderboards.levels.update(user_id, new_xp, new_level)
+
+        pending = self.pending_xp.get(user_id)
+        if pending:
+            pending[0] += xp_gain
+            pending[1] = new_level
+            pending[2] = now.isoformat()
+        else:
+            self.pending_xp[user_id] = [xp_gain, new_level, now.isoformat()]
+
+        if new_level > current_level:
+            levelup_channel = self.bot.get_channel(self.levelup_channel_id)
+            if levelup_channel:
+                try:
+                    await levelup_channel.send(f"🎉 **Level Up!** {message.author.mention} ist jetzt Level **{new_level}**!")
+                except Exception as e:
+                    await self.bot.log(f"Konnte nicht in LevelUp-Channel senden: {e}", "ERROR")
+
+        if len(self.pending_xp) >= XP_FLUSH_THRESHOLD:
+            await self.flush_xp()
 
     @commands.command(name="rank", aliases=["level", "profile"])
     async def rank(self, ctx, member: discord.Member = None):
         member = member or ctx.author
-        async with aiosqlite.connect("leveling.db") as db:
-            cursor = await db.execute("SELECT xp, level FROM users WHERE user_id = ?", (member.id,))
-            row = await cursor.fetchone()
+        row = self.bot.leaderboards.levels.get(member.id)
 
-            if not row:
-                await ctx.send(f"{member.mention} hat noch kein XP gesammelt.")
-                return
+        if not row:
+            await ctx.send(f"{member.mention} hat noch kein XP gesammelt.")
+            return
 
-            xp, level = row
-            next_level_xp = ((level + 1) * 10) ** 2
-            current_level_xp = (level * 10) ** 2
-            xp_needed = next_level_xp - current_level_xp
-            xp_current = xp - current_level_xp
+        xp, _ = row
+        position = self.bot.leaderboards.levels.rank(member.id)
+        level, xp_current, xp_needed = progress(xp)
 
-            progress = min(int((xp_current / xp_needed) * 10), 10)
-            bar = "🟩" * progress + "⬜" * (10 - progress)
+        filled = min(int((xp_current / xp_needed) * 10), 10)
+        bar = "🟩" * filled + "⬜" * (10 - filled)
 
-            embed = discord.Embed(title=f"📊 Level von {member.display_name}", color=discord.Color.gold())
-            embed.add_field(name="Level", value=f"**{level}**", inline=True)
-            embed.add_field(name="XP", value=f"**{xp_current} / {xp_needed}** bis Level {level + 1}", inline=True)
-            embed.add_field(name="Fortschritt", value=bar, inline=False)
-            embed.set_thumbnail(url=member.display_avatar.url)
-            embed.set_footer(text=f"User ID: {member.id}")
-            await ctx.send(embed=embed)
+        embed = discord.Embed(title=f"📊 Level von {member.display_name}", color=discord.Color.gold())
+        embed.add_field(name="Level", value=f"**{level}**", inline=True)
+        embed.add_field(name="XP", value=f"**{xp_current} / {xp_needed}** bis Level {level + 1}", inline=True)
+        embed.add_field(name="Rang", value=f"**#{position}** von {len(self.bot.leaderboards.levels)}", inline=True)
+        embed.add_field(name="Fortschritt", value=bar, inline=False)
+        embed.set_thumbnail(url=member.display_avatar.url)
+        embed.set_footer(text=f"User ID: {member.id}")
+        await ctx.send(embed=embed)
 
     @commands.command(name="leaderboard", aliases=["lb", "top"])
     async def leaderboard(self, ctx):
-        async with aiosqlite.connect("leveling.db") as db:
-            cursor = await db.execute("SELECT user_id, xp, level FROM users ORDER BY level DESC, xp DESC LIMIT 10")
-            rows = await cursor.fetchall()
+        rows = self.bot.leaderboards.levels.top(10)
 
-            if not rows:
-                await ctx.send("Noch keine User im Leaderboard.")
-                return
+        if not rows:
+            await ctx.send("Noch keine User im Leaderboard.")
+            return
 
-            embed = discord.Embed(title="🏆 Leaderboard", color=discord.Color.blue())
-            for i, (user_id, xp, level) in enumerate(rows, 1):
-                user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
-                name = user.display_name if user else f"User {user_id}"
-                embed.add_field(name=f"{i}. {name}", value=f"Level {level} | {xp} XP", inline=False)
-            await ctx.send(embed=embed)
+        names = await self.bot.names.resolve_many([row[0] for row in rows])
+        embed = discord.Embed(title="🏆 Leaderboard", color=discord.Color.blue())
+        for i, (user_id, xp, level) in enumerate(rows, 1):
+            embed.add_field(name=f"{i}. {names[user_id]}", value=f"Level {level} | {xp} XP", inline=False)
+        await ctx.send(embed=embed)
 
 async def setup(bot):
     await bot.add_cog(LevelingCog(bot))
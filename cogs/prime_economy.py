@@ -1,29 +1,83 @@
 # cogs/prime_economy.py
 import discord
-from discord.ext import commands, tasks
-import aiosqlite
+from discord.ext import commands
 import random
 import asyncio
+import math
 from datetime import datetime, timedelta
+from core.scheduler import daily_at, hourly_at
+
+HEIST_DURATION = timedelta(minutes=10)
+HEIST_START_BANK = 1000
+HEIST_SUCCESS_CHANCE = 0.4
+HEIST_RETRY_DELAYS = (5, 30, 120)  # Sekunden bis zum nächsten Abrechnungsversuch, z. B. bei gesperrter economy.db
+
+
+def split_loot(participants, total):
+    # Beute anteilig nach Einsatz; Rundungsreste gehen an die größten Einsätze
+    stakes = sum(participants.values())
+    shares = {user_id: total * stake // stakes for user_id, stake in participants.items()}
+    rest = total - sum(shares.values())
+    for user_id in sorted(participants, key=lambda uid: -participants[uid])[:rest]:
+        shares[user_id] += 1
+    return shares
+
 
 class PrimeEconomyCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.heist_active = False
-        self.heist_participants = {}
+        self.heist_participants = {}  # user_id -> Einsatz (Spiegel von heist_participants in economy.db)
         self.heist_end_time = None
-        self.bank_balance = 1000
+        self.heist_channel_id = None
+        self.heist_task = None
+        self.heist_lock = asyncio.Lock()
+        self.bank_balance = HEIST_START_BANK
         self.allowed_channel_id = self.bot.config["channels"]["economy"]
 
     async def cog_load(self):
-        async with aiosqlite.connect("economy.db") as db:
+        async with self.bot.db.transaction("economy.db") as db:
             await db.execute("CREATE TABLE IF NOT EXISTS coins (user_id INTEGER PRIMARY KEY, balance INTEGER DEFAULT 0)")
-            await db.commit()
+            await db.execute("CREATE TABLE IF NOT EXISTS heist_bank (id INTEGER PRIMARY KEY CHECK (id = 1), balance INTEGER NOT NULL)")
+            await db.execute("CREATE TABLE IF NOT EXISTS heist_state (id INTEGER PRIMARY KEY CHECK (id = 1), channel_id INTEGER, ends_at TEXT NOT NULL)")
+            await db.execute("CREATE TABLE IF NOT EXISTS heist_participants (user_id INTEGER PRIMARY KEY, stake INTEGER NOT NULL)")
+            await db.execute("INSERT OR IGNORE INTO heist_bank (id, balance) VALUES (1, ?)", (HEIST_START_BANK,))
+        await self.bot.leaderboards.load_coins()
+        await self.bot.ledger.load()
+        await self.load_heist()
         await self.bot.log("PrimeEconomyCog: Datenbanktabelle erstellt.", "INFO")
-        self.hourly_heist.start()
+        await self.bot.scheduler.schedule("hourly_heist", hourly_at(0), self.hourly_heist)
+        await self.bot.scheduler.schedule("ledger_snapshot", daily_at(4), self.ledger_snapshot, catch_up=timedelta(hours=20))
 
     def cog_unload(self):
-        self.hourly_heist.cancel()
+        self.bot.scheduler.cancel("hourly_heist")
+        self.bot.scheduler.cancel("ledger_snapshot")
+        # Der Heist bleibt in der Datenbank und wird beim nächsten Laden fortgesetzt
+        if self.heist_task:
+            self.heist_task.cancel()
+            self.heist_task = None
+
+    async def load_heist(self):
+        row = await self.bot.db.fetchone("economy.db", "SELECT balance FROM heist_bank WHERE id = 1")
+        self.bank_balance = row[0]
+        row = await self.bot.db.fetchone("economy.db", "SELECT channel_id, ends_at FROM heist_state WHERE id = 1")
+        if not row:
+            return
+        rows = await self.bot.db.fetchall("economy.db", "SELECT user_id, stake FROM heist_participants")
+        self.heist_active = True
+        self.heist_channel_id = row[0]
+        self.heist_end_time = datetime.fromisoformat(row[1])
+        self.heist_participants = dict(rows)
+        self.heist_task = asyncio.create_task(self.finish_heist())
+        await self.bot.log(f"Laufender Heist mit {len(rows)} Teilnehmern wiederhergestellt.", "INFO")
+
+    async def ledger_snapshot(self, run_time):
+        mismatches = await self.bot.ledger.snapshot()
+        if mismatches:
+            sample = ", ".join(f"{user_id} ({balance} statt {expected})" for user_id, balance, expected in mismatches[:5])
+            await self.bot.log(f"Ledger-Audit: {len(mismatches)} Kontostände weichen vom Journal ab: {sample}", "WARNING")
+        else:
+            await self.bot.log("Ledger-Snapshot erstellt, alle Kontostände stimmen mit dem Journal überein.", "INFO")
 
     def check_channel(self, ctx):
         if ctx.channel.id != self.allowed_channel_id:
@@ -35,7 +89,7 @@ class PrimeEconomyCog(commands.Cog):
         if ctx.channel.id != self.allowed_channel_id:
             await ctx.send(f"ℹ️ Economy-Befehle nur im <#{self.allowed_channel_id}> verfügbar!")
             return
-        await ctx.send("Verwende `.prime convert`, `.prime bank` oder `.prime heist`")
+        await ctx.send("Verwende `.prime convert`, `.prime stats`, `.prime bank` oder `.prime heist`")
 
     @prime.group(name="convert", invoke_without_command=True)
     async def prime_convert(self, ctx):
@@ -50,70 +104,193 @@ class PrimeEconomyCog(commands.Cog):
             await ctx.send("❌ Du musst mehr als 0 XP umwandeln!")
             return
 
-        async with aiosqlite.connect("leveling.db") as db:
-            cursor = await db.execute("SELECT xp FROM users WHERE user_id = ?", (ctx.author.id,))
-            row = await cursor.fetchone()
-            if not row or row[0] < amount:
-                await ctx.send("❌ Du hast nicht genug XP!")
-                return
+        # Gepufferte XP zuerst schreiben, damit der Kontostand aktuell ist
+        leveling_cog = self.bot.get_cog("LevelingCog")
+        if leveling_cog:
+            await leveling_cog.flush_xp()
 
-            coins = amount // 10
-            if coins == 0:
-                await ctx.send("❌ Du brauchst mindestens 10 XP für 1 Coin!")
-                return
+        coins = amount // 10
+        if coins == 0:
+            await ctx.send("❌ Du brauchst mindestens 10 XP für 1 Coin!")
+            return
 
-            await db.execute("UPDATE users SET xp = xp - ? WHERE user_id = ?", (amount, ctx.author.id))
-            await db.commit()
+        # Prüfen, Abziehen und Level an die neue XP anpassen in einem Statement
+        row = await self.bot.db.execute_returning(
+            "leveling.db",
+            "UPDATE users SET xp = xp - ?, level = prime_level(xp - ?) WHERE user_id = ? AND xp >= ? RETURNING xp, level",
+            (amount, amount, ctx.author.id, amount)
+        )
+        if not row:
+            await ctx.send("❌ Du hast nicht genug XP!")
+            return
 
-        async with aiosqlite.connect("economy.db") as db:
-            await db.execute("INSERT INTO coins (user_id, balance) VALUES (?, ?) ON CONFLICT(user_id) DO UPDATE SET balance = balance + ?", (ctx.author.id, coins, coins))
-            await db.commit()
+        if leveling_cog:
+            leveling_cog.xp_cache.pop(ctx.author.id, None)
+        self.bot.leaderboards.levels.update(ctx.author.id, *row)
+
+        await self.bot.wallet.credit(ctx.author.id, coins, "convert")
 
         await ctx.send(f"✅ Du hast **{amount} XP** in **{coins} Coins** umgewandelt!")
         await self.bot.log(f"{ctx.author} hat {amount} XP in {coins} Coins umgewandelt.", "SUCCESS")
 
-    # ... (Rest der Befehle wie .bank, .heist — analog mit await self.bot.log(...))
+    @prime.command(name="stats")
+    async def prime_stats(self, ctx, member: discord.Member = None):
+        self.check_channel(ctx)
+        member = member or ctx.author
+        stats = await self.bot.ledger.user_stats(member.id)
+        if not stats:
+            await ctx.send(f"ℹ️ Für {member.display_name} gibt es noch keine Buchungen.")
+            return
+
+        embed = discord.Embed(title=f"📒 Statistik von {member.display_name}", color=0xFFD700)
+        for game, (rounds, wagered, net) in stats.items():
+            value = f"Netto: **{net:+}** Coins"
+            if rounds:
+                value = f"{rounds} Runden · {wagered} Coins eingesetzt\n" + value
+            embed.add_field(name=game.capitalize(), value=value, inline=True)
+        balance = self.bot.leaderboards.coins.get(member.id)
+        embed.set_footer(text=f"Kontostand: {balance[0] if balance else 0} Coins")
+        await ctx.send(embed=embed)
+
+    @prime.command(name="bank")
+    async def prime_bank(self, ctx):
+        self.check_channel(ctx)
+        embed = discord.Embed(title="🏦 PRIME-BANK", color=0xFFD700)
+        embed.add_field(name="Tresor", value=f"**{self.bank_balance}** Coins", inline=False)
+        if self.heist_active:
+            remaining = max(0, int((self.heist_end_time - datetime.utcnow()).total_seconds()))
+            embed.add_field(
+                name="🚨 Überfall läuft",
+                value=f"{len(self.heist_participants)} Teilnehmer · {sum(self.heist_participants.values())} Coins Einsatz · "
+                      f"noch {remaining // 60}:{remaining % 60:02d} Minuten",
+                inline=False
+            )
+        else:
+            embed.add_field(name="Nächster Überfall", value="Zur vollen Stunde", inline=False)
+        await ctx.send(embed=embed)
+
+    @prime.group(name="heist", invoke_without_command=True)
+    async def prime_heist(self, ctx):
+        if ctx.channel.id != self.allowed_channel_id:
+            return
+        await ctx.send("Verwende `.prime heist join <amount>`, solange ein Überfall läuft.")
+
+    @prime_heist.command(name="join")
+    async def heist_join(self, ctx, amount: int):
+        self.check_channel(ctx)
+        if amount <= 0:
+            await ctx.send("❌ Der Einsatz muss mindestens 1 Coin betragen!")
+            return
+        retry_after = self.bot.limiter.hit("heist", ctx.author.id)
+        if retry_after:
+            await ctx.send(f"⏳ Nicht so schnell! Versuch es in {math.ceil(retry_after)} Sekunden wieder.")
+            return
+
+        async with self.heist_lock:
+            if not self.heist_active or datetime.utcnow() >= self.heist_end_time:
+                await ctx.send("❌ Gerade läuft kein Überfall!")
+                return
+            # Abbuchen und Treuhand-Eintrag in einer Transaktion
+            async with self.bot.wallet.booking("heist") as booking:
+                balance = await booking.debit(ctx.author.id, amount)
+                if balance is not None:
+                    await booking.db.execute(
+                        "INSERT INTO heist_participants (user_id, stake) VALUES (?, ?) ON CONFLICT(user_id) DO UPDATE SET stake = stake + excluded.stake",
+                        (ctx.author.id, amount)
+                    )
+            if balance is None:
+                await ctx.send("❌ Du hast nicht genug Coins!")
+                return
+            stake = self.heist_participants.get(ctx.author.id, 0) + amount
+            self.heist_participants[ctx.author.id] = stake
+
+        await ctx.send(f"🦹 {ctx.author.mention} ist mit **{stake} Coins** dabei! ({len(self.heist_participants)} Teilnehmer)")
+        await self.bot.log(f"{ctx.author} hat {amount} Coins in den Heist eingesetzt.", "INFO")
 
-    @tasks.loop(minutes=1)
-    async def hourly_heist(self):
-        now = datetime.utcnow()
-        if now.minute == 0:
-            channel = self.bot.get_channel(self.allowed_channel_id)
-            if not channel:
-                await self.bot.log("Economy-Channel nicht gefunden!", "ERROR")
+    async def hourly_heist(self, run_time):
+        channel = self.bot.get_channel(self.allowed_channel_id)
+        if not channel:
+            await self.bot.log("Economy-Channel nicht gefunden!", "ERROR")
+            return
+
+        if self.heist_active and self.heist_task is None and datetime.utcnow() >= self.heist_end_time:
+            # Abrechnung ist auch nach allen Wiederholungen gescheitert; heist_state steht noch in der DB — jetzt nachholen
+            try:
+                await self.resolve_heist(self.bot.get_channel(self.heist_channel_id) or channel)
+            except Exception as e:
+                await self.bot.log(f"Offener Heist konnte weiterhin nicht abgerechnet werden: {e}", "ERROR")
                 return
 
+        async with self.heist_lock:
             if self.heist_active:
                 await channel.send("⏳ Ein Heist läuft bereits — überspringe automatischen Start.")
                 return
 
+            # Das Ende wird gespeichert, damit ein Neustart das Zeitfenster nicht verliert
+            end_time = max(run_time, datetime.utcnow()) + HEIST_DURATION
+            await self.bot.db.execute(
+                "economy.db",
+                "INSERT OR REPLACE INTO heist_state (id, channel_id, ends_at) VALUES (1, ?, ?)",
+                (channel.id, end_time.isoformat())
+            )
             self.heist_active = True
             self.heist_participants = {}
-            self.heist_end_time = now + timedelta(minutes=10)
+            self.heist_channel_id = channel.id
+            self.heist_end_time = end_time
 
-            await channel.send(
-                f"🚨 **AUTOMATISCHER BANKÜBERFALL!** Die PRIME-Bank wird **JETZT** überfallen!\n"
-                f"💰 Bankinhalt: **{self.bank_balance} Coins**\n"
-                f"⏱️ Du hast **10 Minuten**, um mit `.prime heist join <amount>` teilzunehmen!"
-            )
-            await self.bot.log("Automatischer Heist gestartet.", "INFO")
-
-            await asyncio.sleep(600)
-            await self.resolve_heist(channel)
+        await channel.send(
+            f"🚨 **AUTOMATISCHER BANKÜBERFALL!** Die PRIME-Bank wird **JETZT** überfallen!\n"
+            f"💰 Bankinhalt: **{self.bank_balance} Coins**\n"
+            f"⏱️ Du hast **10 Minuten**, um mit `.prime heist join <amount>` teilzunehmen!"
+        )
+        await self.bot.log("Automatischer Heist gestartet.", "INFO")
+        self.heist_task = asyncio.create_task(self.finish_heist())
 
-    @hourly_heist.before_loop
-    async def before_hourly_heist(self):
-        await self.bot.wait_until_ready()
-        now = datetime.utcnow()
-        sleep_seconds = (60 - now.minute) * 60 - now.second
-        await asyncio.sleep(sleep_seconds)
+    async def finish_heist(self):
+        delay = (self.heist_end_time - datetime.utcnow()).total_seconds()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        channel = self.bot.get_channel(self.heist_channel_id or self.allowed_channel_id)
+        for retry_delay in (*HEIST_RETRY_DELAYS, None):
+            try:
+                await self.resolve_heist(channel)
+                break
+            except Exception as e:
+                if retry_delay is None:
+                    await self.bot.log(f"Heist konnte nicht abgerechnet werden: {e} — neuer Versuch beim nächsten stündlichen Heist.", "ERROR")
+                    break
+                await self.bot.log(f"Heist konnte nicht abgerechnet werden: {e} — neuer Versuch in {retry_delay}s.", "WARNING")
+                await asyncio.sleep(retry_delay)
+        self.heist_task = None
 
     async def resolve_heist(self, channel):
-        if not self.heist_active:
-            return
+        async with self.heist_lock:
+            if not self.heist_active:
+                return
+            participants = dict(self.heist_participants)
+            total_bet = sum(participants.values())
+            success = total_bet > 0 and random.random() < HEIST_SUCCESS_CHANCE
+            shares = split_loot(participants, self.bank_balance + total_bet) if success else {}
+            new_bank = 0 if success else self.bank_balance + total_bet
 
-        self.heist_active = False
-        total_bet = sum(self.heist_participants.values())
+            # Auszahlungen, Tresor und Aufräumen in einer Transaktion
+            async with self.bot.wallet.booking("heist") as booking:
+                for user_id, share in shares.items():
+                    if share:
+                        await booking.credit(user_id, share)
+                await booking.db.execute("UPDATE heist_bank SET balance = ? WHERE id = 1", (new_bank,))
+                await booking.db.execute("DELETE FROM heist_participants")
+                await booking.db.execute("DELETE FROM heist_state")
+
+            self.heist_active = False
+            self.heist_participants = {}
+            self.heist_end_time = None
+            self.heist_channel_id = None
+            self.bank_balance = new_bank
+
+        if not channel:
+            await self.bot.log(f"Heist abgerechnet, aber Economy-Channel nicht gefunden ({len(participants)} Teilnehmer).", "WARNING")
+            return
 
         if total_bet == 0:
             satirical_messages = [
@@ -125,16 +302,18 @@ class PrimeEconomyCog(commands.Cog):
             await self.bot.log("Heist abgebrochen — keine Teilnehmer.", "WARNING")
             return
 
-        success = random.random() < 0.4
         if success:
-            total_payout = self.bank_balance + total_bet
-            await channel.send(f"🎉 **JACKPOT! DER ÜBERFALL WAR ERFOLGREICH!** 🎉\nDie Crew erbeutet **{total_payout} Coins**!")
-            self.bank_balance = 0
+            total_payout = sum(shares.values())
+            names = await self.bot.names.resolve_many(list(shares))
+            loot = "\n".join(
+                f"• {names[user_id]}: **{share} Coins**"
+                for user_id, share in sorted(shares.items(), key=lambda item: -item[1])[:10]
+            )
+            await channel.send(f"🎉 **JACKPOT! DER ÜBERFALL WAR ERFOLGREICH!** 🎉\nDie Crew erbeutet **{total_payout} Coins**!\n{loot}")
+            await self.bot.log(f"Heist erfolgreich: {total_payout} Coins an {len(shares)} Teilnehmer.", "SUCCESS")
         else:
             await channel.send("🚨 **POLIZEI! ALLE WURDEN GESCHNAPPT!** 💥\nEingesetzte Coins sind verloren!")
-            self.bank_balance += total_bet
-
-        self.heist_participants = {}
+            await self.bot.log(f"Heist gescheitert: {total_bet} Coins gehen an die Bank.", "INFO")
 
 async def setup(bot):
     await bot.add_cog(PrimeEconomyCog(bot))
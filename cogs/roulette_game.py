@@ -1,80 +1,40 @@
 # cogs/roulette_game.py
-import discord
 from discord.ext import commands
-import aiosqlite
-import random
+from core.games import GameCog, Outcome
+from core.payouts import normalize_wager, roulette_color, roulette_payout, spin_roulette
 
-class RouletteGameCog(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        self.allowed_channel_id = self.bot.config["channels"]["roulette"]
+ROULETTE_USAGE = "Verwende `.roulette bet <einsatz> <wette>`\nMögliche Wetten: Zahl (0-36), 'rot', 'schwarz', 'grün', 'gerade', 'ungerade'"
 
-    def check_channel(self, ctx):
-        if ctx.channel.id != self.allowed_channel_id:
-            raise commands.CheckFailure(f"❌ Dieser Befehl ist nur im <#{self.allowed_channel_id}> erlaubt!")
-        return True
+class RouletteGameCog(GameCog):
+    game = "roulette"
+    label = "Roulette"
+    title = "🎯 PRIME ROULETTE"
+    color = 0x228B22
+    channel_key = "roulette"
 
     @commands.group(name="roulette", invoke_without_command=True)
     async def roulette(self, ctx):
-        if ctx.channel.id != self.allowed_channel_id:
-            await ctx.send(f"ℹ️ Nur im <#{self.allowed_channel_id}> verfügbar!")
-            return
-        await ctx.send("Verwende `.roulette bet <einsatz> <wette>`\nMögliche Wetten: Zahl (1-36), 'rot', 'schwarz', 'gerade', 'ungerade'")
+        await self.send_usage(ctx, ROULETTE_USAGE)
 
     @roulette.command(name="bet")
     async def roulette_bet(self, ctx, bet: int, wager: str):
-        self.check_channel(ctx)
-        if bet <= 0:
-            await ctx.send("❌ Der Einsatz muss mindestens 1 Coin betragen!")
-            return
-
-        async with aiosqlite.connect("economy.db") as db:
-            cursor = await db.execute("SELECT balance FROM coins WHERE user_id = ?", (ctx.author.id,))
-            row = await cursor.fetchone()
-            balance = row[0] if row else 0
-
-            if balance < bet:
-                await ctx.send("❌ Du hast nicht genug Coins!")
-                return
-
-            await db.execute("UPDATE coins SET balance = balance - ? WHERE user_id = ?", (bet, ctx.author.id))
-            await db.commit()
-
-        number = random.randint(0, 36)
-        color = "grün" if number == 0 else "rot" if number in [1,3,5,7,9,12,14,16,18,19,21,23,25,27,30,32,34,36] else "schwarz"
-        parity = "gerade" if number % 2 == 0 and number != 0 else "ungerade"
-
-        payout = 0
-        wager = wager.lower()
-
-        if wager.isdigit():
-            if int(wager) == number:
-                payout = bet * 35
-        elif wager == color:
-            payout = bet * 2
-        elif wager == parity and number != 0:
-            payout = bet * 2
-
-        embed = discord.Embed(title="🎯 PRIME ROULETTE", color=0x228B22)
-        embed.add_field(name="Gedreht wurde", value=f"**{number}** ({color})", inline=False)
-        embed.add_field(name="Deine Wette", value=f"**{wager}**", inline=False)
-
-        if payout > 0:
-            async with aiosqlite.connect("economy.db") as db:
-                await db.execute(
-                    "INSERT INTO coins (user_id, balance) VALUES (?, ?) ON CONFLICT(user_id) DO UPDATE SET balance = balance + ?",
-                    (ctx.author.id, payout, payout)
-                )
-                await db.commit()
-            embed.add_field(name="🎉 GEWINN!", value=f"**+{payout} Coins**", inline=False)
-            embed.color = 0x00FF00
-            await self.bot.log(f"{ctx.author} hat {payout} Coins im Roulette gewonnen (Einsatz: {bet}).", "SUCCESS")
-        else:
-            embed.add_field(name="😞 VERLOREN", value="Versuch es beim nächsten Mal!", inline=False)
-            embed.color = 0xFF0000
-            await self.bot.log(f"{ctx.author} hat {bet} Coins im Roulette verloren.", "INFO")
-
-        await ctx.send(embed=embed)
+        await self.play(ctx, bet, wager)
+
+    def validate(self, wager):
+        # Unbekannte Wetten werden abgelehnt, bevor Coins abgebucht werden
+        if normalize_wager(wager) is None:
+            return f"❌ Unbekannte Wette **{wager}**!\n{ROULETTE_USAGE}"
+        return None
+
+    def resolve(self, bet, wager):
+        wager = normalize_wager(wager)
+        number = spin_roulette()
+        return Outcome(roulette_payout(number, wager, bet), {"number": number, "wager": wager})
+
+    def render(self, embed, bet, outcome):
+        number = outcome.details["number"]
+        embed.add_field(name="Gedreht wurde", value=f"**{number}** ({roulette_color(number)})", inline=False)
+        embed.add_field(name="Deine Wette", value=f"**{outcome.details['wager']}**", inline=False)
 
 async def setup(bot):
     await bot.add_cog(RouletteGameCog(bot))
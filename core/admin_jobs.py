@@ -0,0 +1,131 @@
+# core/admin_jobs.py
+import asyncio
+import json
+import re
+from datetime import datetime, timezone
+
+ADMIN_JOBS_DB = "admin_jobs.db"  # Gemeinsam für Bot und Dashboard — auch wenn das Dashboard ein eigener Prozess ist
+ADMIN_JOB_POLL_INTERVAL = 2  # Sekunden, falls der Auftrag aus einem anderen Prozess kommt
+ADMIN_JOB_BATCH = 500  # Einträge pro Transaktion; danach wird der Fortschritt geschrieben
+MAX_JOB_ITEMS = 50_000
+MAX_SKIPPED_SHOWN = 20  # Verworfene Eingaben, die im Ergebnis genannt werden
+
+USER_JOB_KINDS = ("reset_xp", "reset_coins", "delete_user")
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS admin_jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued',
+        total INTEGER NOT NULL DEFAULT 0,
+        done INTEGER NOT NULL DEFAULT 0,
+        result TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+"""
+JOB_COLUMNS = "id, kind, status, total, done, result, created_at, updated_at"
+
+TWITCH_LOGIN = re.compile(r"^[a-z0-9_]{3,25}$")
+
+
+def split_items(*values):
+    # Eingaben aus Textfeldern: Kommas, Semikolons und Zeilenumbrüche trennen; Duplikate fallen weg
+    items = []
+    for value in values:
+        items.extend(item for item in re.split(r"[\s,;]+", value or "") if item)
+    return list(dict.fromkeys(items))[:MAX_JOB_ITEMS]
+
+
+def parse_user_ids(*values):
+    # (gültige IDs, verworfene Eingaben)
+    items = split_items(*values)
+    return [int(item) for item in items if item.isdigit()], [item for item in items if not item.isdigit()]
+
+
+def parse_twitch_logins(*values):
+    items = [item.lower() for item in split_items(*values)]
+    return [item for item in items if TWITCH_LOGIN.match(item)], [item for item in items if not TWITCH_LOGIN.match(item)]
+
+
+def skipped_note(skipped):
+    if not skipped:
+        return ""
+    more = f" (+{len(skipped) - MAX_SKIPPED_SHOWN})" if len(skipped) > MAX_SKIPPED_SHOWN else ""
+    return f"; ungültig: {', '.join(skipped[:MAX_SKIPPED_SHOWN])}{more}"
+
+
+def batches(items, size=ADMIN_JOB_BATCH):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+
+class AdminJobQueue:
+    # Aufträge aus dem Admin-Panel: das Dashboard legt sie an, AdminJobsCog arbeitet sie im Bot ab
+    def __init__(self, db, path=ADMIN_JOBS_DB):
+        self.db = db
+        self.path = path
+        self.wakeup = asyncio.Event()  # Weckt den Runner sofort, wenn Dashboard und Bot im selben Prozess laufen
+        self._ready = False
+
+    async def _ensure_schema(self):
+        if not self._ready:
+            await self.db.execute(self.path, SCHEMA)
+            self._ready = True
+
+    async def enqueue(self, kind, payload, total):
+        await self._ensure_schema()
+        now = _now()
+        row = await self.db.execute_returning(
+            self.path,
+            "INSERT INTO admin_jobs (kind, payload, total, created_at, updated_at) VALUES (?, ?, ?, ?, ?) RETURNING id",
+            (kind, json.dumps(payload), total, now, now)
+        )
+        self.wakeup.set()
+        return row[0]
+
+    @staticmethod
+    def _as_dict(row):
+        return dict(zip(JOB_COLUMNS.split(", "), row))
+
+    async def get(self, job_id):
+        await self._ensure_schema()
+        row = await self.db.fetchone(self.path, f"SELECT {JOB_COLUMNS} FROM admin_jobs WHERE id = ?", (job_id,))
+        return self._as_dict(row) if row else None
+
+    async def recent(self, limit=10):
+        await self._ensure_schema()
+        rows = await self.db.fetchall(self.path, f"SELECT {JOB_COLUMNS} FROM admin_jobs ORDER BY id DESC LIMIT ?", (limit,))
+        return [self._as_dict(row) for row in rows]
+
+    async def claim(self):
+        # Nächsten wartenden Auftrag übernehmen: (id, kind, payload) oder None
+        await self._ensure_schema()
+        row = await self.db.execute_returning(
+            self.path,
+            "UPDATE admin_jobs SET status = 'running', updated_at = ? "
+            "WHERE id = (SELECT id FROM admin_jobs WHERE status = 'queued' ORDER BY id LIMIT 1) "
+            "RETURNING id, kind, payload",
+            (_now(),)
+        )
+        return (row[0], row[1], json.loads(row[2])) if row else None
+
+    async def progress(self, job_id, done):
+        await self.db.execute(self.path, "UPDATE admin_jobs SET done = ?, updated_at = ? WHERE id = ?", (done, _now(), job_id))
+
+    async def finish(self, job_id, status, result):
+        await self.db.execute(
+            self.path,
+            "UPDATE admin_jobs SET status = ?, result = ?, updated_at = ? WHERE id = ?",
+            (status, result, _now(), job_id)
+        )
+
+    async def requeue_interrupted(self):
+        # Aufträge, die beim letzten Beenden noch liefen, von vorn — alle Aktionen sind wiederholbar
+        await self._ensure_schema()
+        return await self.db.execute(self.path, "UPDATE admin_jobs SET status = 'queued', done = 0 WHERE status = 'running'")
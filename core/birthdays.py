@@ -0,0 +1,148 @@
+# core/birthdays.py
+import calendar
+import json
+import os
+from datetime import date as date_cls, timedelta
+
+BIRTHDAY_SCHEMA_VERSION = 1  # user_version nach erfolgter JSON-Migration
+
+
+class BirthdayStore:
+    def __init__(self, db, path="birthdays.db", legacy_file="birthdays.json"):
+        self.db = db
+        self.path = path
+        self.legacy_file = legacy_file
+        self.by_user = {}  # user_id -> {"name", "date", "day", "month", "year"}
+        self.by_date = {}  # (month, day) -> {user_id, ...}
+
+    def __len__(self):
+        return len(self.by_user)
+
+    async def load(self):
+        async with self.db.transaction(self.path) as db:
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS birthdays (
+                    user_id INTEGER PRIMARY KEY,
+                    name TEXT,
+                    day INTEGER NOT NULL,
+                    month INTEGER NOT NULL,
+                    year INTEGER NOT NULL
+                )
+            """)
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_birthdays_date ON birthdays (month, day)")
+            cursor = await db.execute("PRAGMA user_version")
+            version = (await cursor.fetchone())[0]
+            migrated = 0
+            if version < BIRTHDAY_SCHEMA_VERSION:
+                migrated = await self._migrate_legacy_file(db)
+                await db.execute(f"PRAGMA user_version = {BIRTHDAY_SCHEMA_VERSION}")
+
+        rows = await self.db.fetchall(self.path, "SELECT user_id, name, day, month, year FROM birthdays")
+        self.by_user = {}
+        self.by_date = {}
+        for user_id, name, day, month, year in rows:
+            self._index(user_id, name, day, month, year)
+        return migrated
+
+    async def _migrate_legacy_file(self, db):
+        # Einmalige Übernahme aus birthdays.json
+        if not os.path.exists(self.legacy_file):
+            return 0
+        with open(self.legacy_file, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
+        rows = []
+        for user_id_str, data in legacy.items():
+            day, month, year = map(int, data["date"].split("."))
+            rows.append((int(user_id_str), data.get("name"), day, month, year))
+        await db.executemany(
+            "INSERT OR IGNORE INTO birthdays (user_id, name, day, month, year) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+        return len(rows)
+
+    def _index(self, user_id, name, day, month, year):
+        self._unindex(user_id)
+        self.by_user[user_id] = {
+            "name": name,
+            "date": f"{day:02d}.{month:02d}.{year:04d}",
+            "day": day,
+            "month": month,
+            "year": year
+        }
+        self.by_date.setdefault((month, day), set()).add(user_id)
+
+    def _unindex(self, user_id):
+        entry = self.by_user.pop(user_id, None)
+        if entry is None:
+            return None
+        key = (entry["month"], entry["day"])
+        user_ids = self.by_date.get(key)
+        if user_ids is not None:
+            user_ids.discard(user_id)
+            if not user_ids:
+                del self.by_date[key]
+        return entry
+
+    def get(self, user_id):
+        return self.by_user.get(user_id)
+
+    async def set(self, user_id, name, day, month, year):
+        await self.db.execute(
+            self.path,
+            "INSERT INTO birthdays (user_id, name, day, month, year) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET name = excluded.name, day = excluded.day, month = excluded.month, year = excluded.year",
+            (user_id, name, day, month, year)
+        )
+        self._index(user_id, name, day, month, year)
+        return self.by_user[user_id]
+
+    async def remove(self, user_id):
+        if user_id not in self.by_user:
+            return False
+        await self.db.execute(self.path, "DELETE FROM birthdays WHERE user_id = ?", (user_id,))
+        self._unindex(user_id)
+        return True
+
+    async def remove_many(self, user_ids):
+        # Ein Statement für alle; liefert die Anzahl entfernter Einträge
+        user_ids = [user_id for user_id in user_ids if user_id in self.by_user]
+        if user_ids:
+            await self.db.executemany(self.path, "DELETE FROM birthdays WHERE user_id = ?", [(user_id,) for user_id in user_ids])
+            for user_id in user_ids:
+                self._unindex(user_id)
+        return len(user_ids)
+
+    def next_birthday(self, user_id, today):
+        entry = self.by_user.get(user_id)
+        if entry is None:
+            return None
+        for year in (today.year, today.year + 1):
+            day = entry["day"]
+            if entry["month"] == 2 and day == 29 and not calendar.isleap(year):
+                day = 28
+            next_date = date_cls(year, entry["month"], day)
+            if next_date >= today:
+                return next_date
+
+    def on_date(self, date):
+        user_ids = set(self.by_date.get((date.month, date.day), ()))
+        # 29.02.-Geburtstage werden in Nicht-Schaltjahren am 28.02. gefeiert
+        if date.month == 2 and date.day == 28 and not calendar.isleap(date.year):
+            user_ids |= self.by_date.get((2, 29), set())
+        return sorted(user_ids)
+
+    def upcoming(self, start, days):
+        # Liefert (datum, user_id, eintrag) für start .. start + days - 1
+        result = []
+        for offset in range(days):
+            date = start + timedelta(days=offset)
+            for user_id in self.on_date(date):
+                result.append((date, user_id, self.by_user[user_id]))
+        return result
+
+    def calendar_order(self):
+        return [
+            (user_id, self.by_user[user_id])
+            for key in sorted(self.by_date)
+            for user_id in sorted(self.by_date[key])
+        ]
@@ -0,0 +1,13 @@
+# core/concurrency.py
+import asyncio
+
+
+async def bounded_gather(aws, limit):
+    # Wie asyncio.gather(..., return_exceptions=True), aber mit höchstens `limit` gleichzeitigen Aufrufen
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(aw):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(run(aw) for aw in aws), return_exceptions=True)
@@ -0,0 +1,267 @@
+# core/dashboard_data.py
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+from collections import namedtuple
+from datetime import datetime, timezone
+
+DASHBOARD_REFRESH_INTERVAL = 15  # Sekunden zwischen zwei Snapshots
+DASHBOARD_MIN_REFRESH = 2  # Mindestabstand, auch wenn mark_dirty() öfter kommt
+SUBSCRIBER_QUEUE_SIZE = 16  # Wer so weit zurückliegt, bekommt statt der Deltas einen kompletten Stand
+SNAPSHOT_POLL_INTERVAL = 1  # Sekunden; so oft schaut ein separater Dashboard-Prozess nach einer neuen Datei
+
+# Unveränderlich: data wird nach dem Bau nicht mehr angefasst, html ist fertig gerendert,
+# api enthält pro Abschnitt den fertigen JSON-Body samt gzip-Fassung
+Snapshot = namedtuple("Snapshot", "data etag built_at html api")
+ApiBody = namedtuple("ApiBody", "etag body gzip")
+
+# Abschnitte der JSON-API (/api/v1/<name>) und der Live-Updates
+API_SECTIONS = {
+    "leaderboards": lambda data: {"levels": data["top_level"], "coins": data["top_coins"]},
+    "economy": lambda data: {"games": data["game_stats"], "bank": data["bank"]},
+    "streams": lambda data: {"live": data["active_streamers"]},
+    "birthdays": lambda data: {"upcoming": data["upcoming_birthdays"]},
+    "status": lambda data: {"server_name": data["server_name"], "started_at": data["started_at"]},
+}
+RESYNC = None  # Signal in der Queue eines Abonnenten: kompletten Stand neu senden
+
+
+def encode_json(payload):
+    return json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str).encode()
+
+
+def api_bodies(data):
+    bodies = {}
+    for name, section in API_SECTIONS.items():
+        body = encode_json(section(data))
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        bodies[name] = ApiBody(etag, body, gzip.compress(body, 6))
+    return bodies
+
+
+def sections_event(api, names):
+    # {"leaderboards": {...}, ...} aus den fertigen Bodies zusammensetzen, ohne neu zu serialisieren
+    return b"{" + b",".join(b'"' + name.encode() + b'":' + api[name].body for name in names) + b"}"
+
+
+class SnapshotUnavailable(Exception):
+    pass
+
+
+def write_snapshot_file(path, snapshot):
+    # Atomar: erst in eine Nachbardatei schreiben, dann umbenennen — Leser sehen nie eine halbe Datei
+    payload = {"etag": snapshot.etag, "built_at": snapshot.built_at.isoformat(), "data": snapshot.data}
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(encode_json(payload))
+    os.replace(tmp_path, path)
+
+
+def read_snapshot_file(path):
+    with open(path, "rb") as f:
+        payload = json.loads(f.read())
+    return payload["data"], payload["etag"], datetime.fromisoformat(payload["built_at"])
+
+
+class SnapshotSource:
+    # Gemeinsame Schnittstelle für den Webserver: get() liefert den aktuellen Snapshot, subscribe() die Deltas
+    def __init__(self):
+        self.render = None  # async data -> HTML-String, wird vom Webserver gesetzt
+        self.current = None
+        self._task = None
+        self._subscribers = set()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def get(self):
+        raise NotImplementedError
+
+    async def _run(self):
+        raise NotImplementedError
+
+    async def _replace(self, data, etag, built_at):
+        html = (await self.render(data)).encode() if self.render else b""
+        previous = self.current
+        self.current = Snapshot(data, etag, built_at, html, api_bodies(data))
+        if previous and self._subscribers:
+            changed = [name for name, body in self.current.api.items() if body.etag != previous.api[name].etag]
+            if changed:
+                self._publish(self.current, changed)
+        return self.current
+
+    def subscribe(self):
+        # Queue mit (etag, JSON der geänderten Abschnitte) pro neuem Snapshot
+        queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+
+    def _publish(self, snapshot, changed):
+        event = (snapshot.etag, sections_event(snapshot.api, changed))
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Langsamer Client: alte Deltas verwerfen, er bekommt den kompletten Stand
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+
+
+class DashboardData(SnapshotSource):
+    # Baut die Daten der öffentlichen Seite im Hintergrund; Requests lesen nur den fertigen Snapshot.
+    # Mit publish_path wird jeder neue Snapshot zusätzlich für einen separaten Dashboard-Prozess abgelegt.
+    def __init__(self, bot, interval=DASHBOARD_REFRESH_INTERVAL, publish_path=None):
+        super().__init__()
+        self.bot = bot
+        self.interval = interval
+        self.publish_path = publish_path
+        self._dirty = asyncio.Event()
+        self._build_lock = asyncio.Lock()
+
+    def mark_dirty(self):
+        # Für Änderungen, die nicht bis zum nächsten Intervall warten sollen (Streams, Geburtstage)
+        self._dirty.set()
+
+    async def get(self):
+        if self.current is None:
+            await self.build()
+        return self.current
+
+    def _versions(self):
+        return self.bot.leaderboards.levels.version, self.bot.leaderboards.coins.version
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await self.build()
+            except Exception as e:
+                await self.bot.log(f"Dashboard-Snapshot fehlgeschlagen: {e}", "ERROR")
+            # Spätestens nach dem Intervall neu bauen; früher bei mark_dirty() oder wenn sich XP oder Coins bewegt haben
+            versions = self._versions()
+            deadline = loop.time() + self.interval
+            while loop.time() < deadline:
+                try:
+                    await asyncio.wait_for(self._dirty.wait(), min(DASHBOARD_MIN_REFRESH, deadline - loop.time()))
+                    await asyncio.sleep(DASHBOARD_MIN_REFRESH)
+                    break
+                except asyncio.TimeoutError:
+                    if self._versions() != versions:
+                        break
+            self._dirty.clear()
+
+    async def build(self):
+        async with self._build_lock:
+            data = await self.collect()
+            body = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+            etag = '"' + hashlib.sha1(body.encode()).hexdigest()[:20] + '"'
+            # Unveränderte Daten: alter Snapshot bleibt, ETag und Last-Modified auch
+            if self.current and self.current.etag == etag:
+                return self.current
+            snapshot = await self._replace(data, etag, datetime.now(timezone.utc).replace(microsecond=0))
+            if self.publish_path:
+                await asyncio.to_thread(write_snapshot_file, self.publish_path, snapshot)
+            return snapshot
+
+    async def collect(self):
+        bot = self.bot
+        rows = bot.leaderboards.levels.top(10)
+        coin_rows = bot.leaderboards.coins.top(10)
+
+        birthdays = []
+        birthday_cog = bot.get_cog("BirthdayManagerCog")
+        today = datetime.now(timezone.utc).date()
+        if birthday_cog:
+            birthdays = birthday_cog.store.upcoming(today, 8)
+
+        # Alle Namen in einem Rutsch — der NameResolver cacht und bündelt die Anfragen
+        names = await bot.names.resolve_many(
+            [row[0] for row in rows] + [row[0] for row in coin_rows] + [user_id for _, user_id, _ in birthdays],
+            {user_id: data["name"] for _, user_id, data in birthdays}
+        )
+
+        streams = []
+        twitch_cog = bot.get_cog("TwitchAlertsCog")
+        if twitch_cog:
+            for login, stream in sorted(twitch_cog.live_streams.items()):
+                streams.append({
+                    "user_login": login,
+                    "user_name": stream.get("user_name", login),
+                    "game_name": stream.get("game_name") or "Live",
+                    "viewer_count": stream.get("viewer_count", 0)
+                })
+
+        bank = None
+        economy_cog = bot.get_cog("PrimeEconomyCog")
+        if economy_cog:
+            bank = {"balance": economy_cog.bank_balance, "heist_active": economy_cog.heist_active}
+
+        game_stats = [
+            {"game": game, "rounds": rounds, "wagered": wagered, "net": net}
+            for game, (rounds, wagered, net) in sorted(bot.ledger.game_totals.items(), key=lambda item: -item[1][1])
+            if rounds
+        ]
+
+        return {
+            "top_level": [{"user_id": str(user_id), "name": names[user_id], "xp": xp, "level": level} for user_id, xp, level in rows],
+            "top_coins": [{"user_id": str(user_id), "name": names[user_id], "balance": balance} for user_id, balance in coin_rows],
+            "active_streamers": streams,
+            "upcoming_birthdays": [
+                {"user_id": str(user_id), "name": names[user_id], "date": data["date"], "days_until": (next_bday - today).days}
+                for next_bday, user_id, data in birthdays
+            ],
+            "game_stats": game_stats,
+            "bank": bank,
+            "server_name": bot.guilds[0].name if bot.guilds else "PRIME-Server",
+            "guilds": [{"id": str(guild.id), "name": guild.name} for guild in bot.guilds],
+            "started_at": bot.start_time.isoformat()
+        }
+
+
+class FileSnapshotSource(SnapshotSource):
+    # Gegenstück im separaten Dashboard-Prozess: liest die Datei, die der Bot über publish_path ablegt
+    def __init__(self, path, poll_interval=SNAPSHOT_POLL_INTERVAL):
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self._stat = None
+
+    async def get(self):
+        if self.current is None:
+            await self.reload()
+        if self.current is None:
+            raise SnapshotUnavailable(self.path)
+        return self.current
+
+    async def reload(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        if self._stat == (stat.st_mtime_ns, stat.st_size):
+            return False
+        data, etag, built_at = await asyncio.to_thread(read_snapshot_file, self.path)
+        self._stat = (stat.st_mtime_ns, stat.st_size)
+        if self.current is None or self.current.etag != etag:
+            await self._replace(data, etag, built_at)
+        return True
+
+    async def _run(self):
+        while True:
+            try:
+                await self.reload()
+            except (OSError, ValueError, KeyError):
+                pass  # Datei wird gerade ersetzt oder ist kaputt — beim nächsten Durchlauf erneut
+            await asyncio.sleep(self.poll_interval)
@@ -0,0 +1,96 @@
+# core/database.py
+import asyncio
+from contextlib import asynccontextmanager
+
+import aiosqlite
+
+# Einmalig pro Verbindung gesetzte PRAGMAs
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",
+    "PRAGMA busy_timeout = 5000",
+)
+STATEMENT_CACHE_SIZE = 256  # Vorbereitete Statements, die sqlite3 pro Verbindung wiederverwendet
+MAX_CONCURRENCY = 8  # Gleichzeitige Datenbankzugriffe über alle Dateien
+
+
+class Database:
+    def __init__(self, max_concurrency=MAX_CONCURRENCY):
+        self._connections = {}
+        self._locks = {}
+        self._connect_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._functions = {}  # name -> (Parameteranzahl, Funktion), gilt für alle Verbindungen
+
+    async def connection(self, path):
+        conn = self._connections.get(path)
+        if conn is None:
+            async with self._connect_lock:
+                conn = self._connections.get(path)
+                if conn is None:
+                    conn = await aiosqlite.connect(path, cached_statements=STATEMENT_CACHE_SIZE)
+                    for pragma in PRAGMAS:
+                        await conn.execute(pragma)
+                    for name, (num_params, func) in self._functions.items():
+                        await conn.create_function(name, num_params, func, deterministic=True)
+                    self._locks[path] = asyncio.Lock()
+                    self._connections[path] = conn
+        return conn
+
+    async def create_function(self, name, num_params, func):
+        # Python-Funktion in SQL verfügbar machen — auf offenen und künftigen Verbindungen
+        self._functions[name] = (num_params, func)
+        for conn in self._connections.values():
+            await conn.create_function(name, num_params, func, deterministic=True)
+
+    @asynccontextmanager
+    async def transaction(self, path):
+        # Eine Verbindung pro Datei — der Lock verhindert, dass sich Transaktionen vermischen
+        conn = await self.connection(path)
+        async with self._semaphore, self._locks[path]:
+            try:
+                yield conn
+            except BaseException:
+                await conn.rollback()
+                raise
+            else:
+                await conn.commit()
+
+    async def execute(self, path, sql, params=()):
+        async with self.transaction(path) as db:
+            cursor = await db.execute(sql, params)
+            return cursor.rowcount
+
+    async def execute_returning(self, path, sql, params=()):
+        # Für Statements mit RETURNING: schreibt und liefert die erste Zeile
+        async with self.transaction(path) as db:
+            async with db.execute(sql, params) as cursor:
+                return await cursor.fetchone()
+
+    async def executemany(self, path, sql, rows):
+        async with self.transaction(path) as db:
+            cursor = await db.executemany(sql, rows)
+            return cursor.rowcount
+
+    async def fetchone(self, path, sql, params=()):
+        conn = await self.connection(path)
+        async with self._semaphore, self._locks[path]:
+            async with conn.execute(sql, params) as cursor:
+                return await cursor.fetchone()
+
+    async def fetchall(self, path, sql, params=()):
+        conn = await self.connection(path)
+        async with self._semaphore, self._locks[path]:
+            async with conn.execute(sql, params) as cursor:
+                return await cursor.fetchall()
+
+    async def close(self):
+        connections, self._connections = self._connections, {}
+        self._locks = {}
+        for conn in connections.values():
+            try:
+                await conn.close()
+            except Exception as e:
+                print(f"[DB FEHLER] Verbindung konnte nicht geschlossen werden: {e}")
@@ -0,0 +1,110 @@
+# core/games.py
+import math
+from abc import ABCMeta, abstractmethod
+from collections import namedtuple
+
+import discord
+from discord.ext import commands
+
+# payout = Gesamtauszahlung inkl. Einsatz (0 = verloren), bei Mehrspieler-Spielen user_id -> Auszahlung;
+# details = Daten für render()
+Outcome = namedtuple("Outcome", "payout details")
+
+
+class GameCogMeta(commands.CogMeta, ABCMeta):
+    # Ein Spiel ohne resolve() oder render() lässt sich so gar nicht erst laden
+    pass
+
+
+class GameCog(commands.Cog, metaclass=GameCogMeta):
+    # Gemeinsamer Ablauf aller Casino-Spiele: prüfen → auswerten → in einer Buchung abrechnen → anzeigen.
+    # Ein neues Spiel setzt die Klassenattribute und implementiert resolve() und render().
+    game = None  # Name im Ledger
+    label = None  # Anzeigename in Logs
+    title = None
+    color = 0x8A2BE2
+    channel_key = None  # Schlüssel in config["channels"]
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.allowed_channel_id = self.bot.config["channels"][self.channel_key]
+
+    def check_channel(self, ctx):
+        if ctx.channel.id != self.allowed_channel_id:
+            raise commands.CheckFailure(f"❌ Dieser Befehl ist nur im <#{self.allowed_channel_id}> erlaubt!")
+        return True
+
+    async def check_rate(self, ctx, key=None):
+        # True, wenn der User gerade zu schnell spielt (Meldung ist dann schon gesendet)
+        retry_after = self.bot.limiter.hit(key or self.game, ctx.author.id)
+        if retry_after:
+            await ctx.send(f"⏳ Nicht so schnell! Versuch es in {math.ceil(retry_after)} Sekunden wieder.")
+            return True
+        return False
+
+    async def send_usage(self, ctx, usage):
+        if ctx.channel.id != self.allowed_channel_id:
+            await ctx.send(f"ℹ️ Nur im <#{self.allowed_channel_id}> verfügbar!")
+            return
+        await ctx.send(usage)
+
+    def validate(self, *args):
+        # Fehlermeldung oder None — läuft vor jeder Buchung
+        return None
+
+    @abstractmethod
+    def resolve(self, bet, *args):
+        # Outcome des Spiels — steht fest, bevor Coins bewegt werden
+        ...
+
+    @abstractmethod
+    def render(self, embed, bet, outcome):
+        # Spielspezifische Felder im Ergebnis-Embed; Gewinn/Verlust ergänzt play()
+        ...
+
+    async def settle_players(self, stakes, payouts):
+        # Gegenstück zu settle_bet für mehrere Spieler: alle Einsätze und Auszahlungen in einer Buchung.
+        # user_id des ersten, der seinen Einsatz nicht zahlen kann (dann wird nichts gebucht), sonst None
+        broke = None
+        async with self.bot.wallet.booking(self.game) as booking:
+            for user_id, stake in stakes.items():
+                if await booking.debit(user_id, stake) is None:
+                    broke = user_id
+                    booking.abort()
+            for user_id, payout in payouts.items():
+                if payout:
+                    await booking.credit(user_id, payout)
+        return broke
+
+    async def play(self, ctx, bet, *args):
+        self.check_channel(ctx)
+        if bet <= 0:
+            await ctx.send("❌ Der Einsatz muss mindestens 1 Coin betragen!")
+            return
+        error = self.validate(*args)
+        if error:
+            await ctx.send(error)
+            return
+        if await self.check_rate(ctx):
+            return
+
+        # Parallele Einsätze desselben Users laufen nacheinander
+        async with self.bot.limiter.exclusive(ctx.author.id):
+            # Ergebnis steht vor der Buchung fest: Einsatz und Gewinn gehen in ein Statement
+            outcome = self.resolve(bet, *args)
+            if await self.bot.wallet.settle_bet(ctx.author.id, bet, outcome.payout, self.game) is None:
+                await ctx.send("❌ Du hast nicht genug Coins!")
+                return
+
+            embed = discord.Embed(title=self.title, color=self.color)
+            self.render(embed, bet, outcome)
+            if outcome.payout > 0:
+                embed.add_field(name="🎉 GEWINN!", value=f"**+{outcome.payout} Coins**", inline=False)
+                embed.color = 0x00FF00
+                await self.bot.log(f"{ctx.author} hat {outcome.payout} Coins im {self.label} gewonnen (Einsatz: {bet}).", "SUCCESS")
+            else:
+                embed.add_field(name="😞 VERLOREN", value="Versuch es beim nächsten Mal!", inline=False)
+                embed.color = 0xFF0000
+                await self.bot.log(f"{ctx.author} hat {bet} Coins im {self.label} verloren.", "INFO")
+
+            await ctx.send(embed=embed)
@@ -0,0 +1,122 @@
+# core/leaderboard.py
+from bisect import bisect_left, insort
+
+BUCKET_SIZE = 1000  # Schlüssel pro Block; ein Einfügen oder Löschen verschiebt höchstens einen Block
+
+
+class SortedKeys:
+    # Sortierte Liste in Blöcken — bei einer flachen Liste verschiebt jedes XP-Update alle Einträge dahinter (O(n))
+    def __init__(self, keys=()):
+        keys = sorted(keys)
+        self._buckets = [keys[i:i + BUCKET_SIZE] for i in range(0, len(keys), BUCKET_SIZE)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._len = len(keys)
+
+    def __len__(self):
+        return self._len
+
+    def add(self, key):
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+        else:
+            i = min(bisect_left(self._maxes, key), len(self._buckets) - 1)
+            bucket = self._buckets[i]
+            insort(bucket, key)
+            self._maxes[i] = bucket[-1]
+            if len(bucket) > 2 * BUCKET_SIZE:
+                self._buckets[i:i + 1] = [bucket[:BUCKET_SIZE], bucket[BUCKET_SIZE:]]
+                self._maxes[i:i + 1] = [bucket[BUCKET_SIZE - 1], bucket[-1]]
+        self._len += 1
+
+    def remove(self, key):
+        i = bisect_left(self._maxes, key)
+        bucket = self._buckets[i]
+        del bucket[bisect_left(bucket, key)]
+        if bucket:
+            self._maxes[i] = bucket[-1]
+        else:
+            del self._buckets[i]
+            del self._maxes[i]
+        self._len -= 1
+
+    def index(self, key):
+        # Position eines enthaltenen Schlüssels; summiert nur die Blocklängen davor
+        i = bisect_left(self._maxes, key)
+        return sum(len(bucket) for bucket in self._buckets[:i]) + bisect_left(self._buckets[i], key)
+
+    def first(self, n):
+        result = []
+        for bucket in self._buckets:
+            if len(result) >= n:
+                break
+            result.extend(bucket[:n - len(result)])
+        return result
+
+
+class RankIndex:
+    # Sortierte Schlüssel aller User: Top-N liest den ersten Block, der Rang ist ein bisect
+    def __init__(self, key):
+        self._key = key
+        self._keys = SortedKeys()
+        self._entries = {}  # user_id -> (sort_key, values)
+        self.version = 0  # Zählt jede Änderung — das Dashboard erkennt daran, dass es neu bauen muss
+
+    def __len__(self):
+        return len(self._keys)
+
+    def load(self, rows):
+        self._entries = {row[0]: (self._key(*row), tuple(row[1:])) for row in rows}
+        self._keys = SortedKeys(entry[0] for entry in self._entries.values())
+        self.version += 1
+
+    def get(self, user_id):
+        entry = self._entries.get(user_id)
+        return entry[1] if entry else None
+
+    def update(self, user_id, *values):
+        new_key = self._key(user_id, *values)
+        old = self._entries.get(user_id)
+        if old is not None:
+            if old[0] == new_key:
+                self._entries[user_id] = (new_key, values)
+                return
+            self._keys.remove(old[0])
+        self._keys.add(new_key)
+        self._entries[user_id] = (new_key, values)
+        self.version += 1
+
+    def remove(self, user_id):
+        old = self._entries.pop(user_id, None)
+        if old is not None:
+            self._keys.remove(old[0])
+            self.version += 1
+
+    def top(self, n=10):
+        # Der letzte Teil jedes Schlüssels ist die user_id
+        return [(key[-1], *self._entries[key[-1]][1]) for key in self._keys.first(n)]
+
+    def rank(self, user_id):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        return self._keys.index(entry[0]) + 1
+
+
+class Leaderboards:
+    def __init__(self, db):
+        self.db = db
+        self.levels = RankIndex(lambda user_id, xp, level: (-level, -xp, user_id))
+        self.coins = RankIndex(lambda user_id, balance: (-balance, user_id))
+
+    # Geladen wird einmal die ganze Tabelle, sortiert wird im Speicher — ein Index auf level/xp oder balance
+    # würde keine Abfrage beschleunigen, aber jedes XP- und Coin-Update verteuern
+    async def load_levels(self):
+        await self.db.execute("leveling.db", "DROP INDEX IF EXISTS idx_users_rank")
+        rows = await self.db.fetchall("leveling.db", "SELECT user_id, xp, level FROM users")
+        self.levels.load(rows)
+
+    async def load_coins(self):
+        await self.db.execute("economy.db", "DROP INDEX IF EXISTS idx_coins_balance")
+        rows = await self.db.fetchall("economy.db", "SELECT user_id, balance FROM coins")
+        self.coins.load(rows)
@@ -0,0 +1,193 @@
+# core/ledger.py
+import asyncio
+from datetime import datetime, timezone
+
+ECONOMY_DB = "economy.db"
+LEDGER_FLUSH_INTERVAL = 10  # Sekunden
+LEDGER_FLUSH_THRESHOLD = 500  # Gepufferte Buchungen, ab denen sofort geschrieben wird
+SNAPSHOT_RETENTION = 14  # Aufbewahrte Kontostand-Snapshots
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS ledger (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        game TEXT NOT NULL,
+        amount INTEGER NOT NULL,
+        wagered INTEGER NOT NULL DEFAULT 0,
+        balance INTEGER NOT NULL,
+        created_at TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_ledger_user ON ledger (user_id, id)",
+    """
+    CREATE TABLE IF NOT EXISTS ledger_stats (
+        user_id INTEGER NOT NULL,
+        game TEXT NOT NULL,
+        rounds INTEGER NOT NULL DEFAULT 0,
+        wagered INTEGER NOT NULL DEFAULT 0,
+        net INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, game)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ledger_snapshots (
+        snapshot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ledger_id INTEGER NOT NULL,
+        created_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS balance_snapshots (
+        snapshot_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        balance INTEGER NOT NULL,
+        PRIMARY KEY (snapshot_id, user_id)
+    )
+    """,
+)
+
+# Kontostände, die nicht zu letztem Snapshot + seitherigen Buchungen passen
+AUDIT_SQL = """
+    SELECT c.user_id, c.balance, COALESCE(s.balance, 0) + COALESCE(l.total, 0)
+    FROM coins c
+    LEFT JOIN balance_snapshots s ON s.snapshot_id = ? AND s.user_id = c.user_id
+    LEFT JOIN (SELECT user_id, SUM(amount) AS total FROM ledger WHERE id > ? GROUP BY user_id) l ON l.user_id = c.user_id
+    WHERE c.balance != COALESCE(s.balance, 0) + COALESCE(l.total, 0)
+"""
+
+
+async def _print_log(message, level="INFO"):
+    print(f"[{level}] {message}")
+
+
+class Ledger:
+    # Append-only-Journal aller Coin-Buchungen; der aktuelle Kontostand bleibt in `coins`
+    def __init__(self, db, path=ECONOMY_DB, log=None):
+        self.db = db
+        self.path = path
+        self.log = log or _print_log  # Im Bot bot.log; Skripte ohne Bot geben nur auf der Konsole aus
+        self.pending = []  # (user_id, game, amount, wagered, balance, created_at)
+        self.game_totals = {}  # game -> [rounds, wagered, net]
+        self.flush_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task = None
+
+    async def load(self):
+        async with self.db.transaction(self.path) as db:
+            for statement in SCHEMA:
+                await db.execute(statement)
+        rows = await self.db.fetchall(
+            self.path,
+            "SELECT game, SUM(rounds), SUM(wagered), SUM(net) FROM ledger_stats GROUP BY game"
+        )
+        self.game_totals = {game: [rounds, wagered, net] for game, rounds, wagered, net in rows}
+        # Ohne Snapshot gibt es keine Ausgangsbasis für Audits
+        if await self.db.fetchone(self.path, "SELECT 1 FROM ledger_snapshots LIMIT 1") is None:
+            await self.snapshot()
+
+    def record(self, user_id, game, amount, balance, wagered=0):
+        self.pending.append((user_id, game, amount, wagered, balance, datetime.now(timezone.utc).isoformat()))
+        totals = self.game_totals.setdefault(game, [0, 0, 0])
+        totals[0] += 1 if wagered else 0
+        totals[1] += wagered
+        totals[2] += amount
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        if len(self.pending) >= LEDGER_FLUSH_THRESHOLD:
+            self._wake.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), LEDGER_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                await self.log(f"Ledger: Buchungen konnten nicht geschrieben werden, neuer Versuch beim nächsten Flush: {e}", "ERROR")
+
+    async def _write(self, db, batch):
+        stats = {}
+        for user_id, game, amount, wagered, _, _ in batch:
+            entry = stats.setdefault((user_id, game), [0, 0, 0])
+            entry[0] += 1 if wagered else 0
+            entry[1] += wagered
+            entry[2] += amount
+        await db.executemany(
+            "INSERT INTO ledger (user_id, game, amount, wagered, balance, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            batch
+        )
+        await db.executemany(
+            "INSERT INTO ledger_stats (user_id, game, rounds, wagered, net) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(user_id, game) DO UPDATE SET rounds = rounds + excluded.rounds, "
+            "wagered = wagered + excluded.wagered, net = net + excluded.net",
+            [(user_id, game, *entry) for (user_id, game), entry in stats.items()]
+        )
+
+    async def flush(self):
+        async with self.flush_lock:
+            if not self.pending:
+                return
+            batch, self.pending = self.pending, []
+            try:
+                async with self.db.transaction(self.path) as db:
+                    await self._write(db, batch)
+            except Exception:
+                # Nicht geschriebene Buchungen bleiben in Reihenfolge im Puffer
+                self.pending[:0] = batch
+                raise
+
+    async def snapshot(self):
+        # Puffer und Snapshot in einer Transaktion, damit die Ledger-Grenze exakt passt
+        async with self.flush_lock:
+            batch, self.pending = self.pending, []
+            try:
+                async with self.db.transaction(self.path) as db:
+                    if batch:
+                        await self._write(db, batch)
+                    async with db.execute("SELECT snapshot_id, ledger_id FROM ledger_snapshots ORDER BY snapshot_id DESC LIMIT 1") as cursor:
+                        previous = await cursor.fetchone()
+                    mismatches = []
+                    if previous:
+                        async with db.execute(AUDIT_SQL, previous) as cursor:
+                            mismatches = await cursor.fetchall()
+                    async with db.execute("SELECT COALESCE(MAX(id), 0) FROM ledger") as cursor:
+                        ledger_id = (await cursor.fetchone())[0]
+                    cursor = await db.execute(
+                        "INSERT INTO ledger_snapshots (ledger_id, created_at) VALUES (?, ?)",
+                        (ledger_id, datetime.now(timezone.utc).isoformat())
+                    )
+                    snapshot_id = cursor.lastrowid
+                    await db.execute(
+                        "INSERT INTO balance_snapshots (snapshot_id, user_id, balance) SELECT ?, user_id, balance FROM coins",
+                        (snapshot_id,)
+                    )
+                    await db.execute(
+                        "DELETE FROM balance_snapshots WHERE snapshot_id <= ?", (snapshot_id - SNAPSHOT_RETENTION,)
+                    )
+                    await db.execute(
+                        "DELETE FROM ledger_snapshots WHERE snapshot_id <= ?", (snapshot_id - SNAPSHOT_RETENTION,)
+                    )
+            except Exception:
+                self.pending[:0] = batch
+                raise
+        return mismatches
+
+    async def user_stats(self, user_id):
+        # game -> (rounds, wagered, net), inklusive noch gepufferter Buchungen
+        await self.flush()
+        rows = await self.db.fetchall(
+            self.path,
+            "SELECT game, rounds, wagered, net FROM ledger_stats WHERE user_id = ? ORDER BY wagered DESC",
+            (user_id,)
+        )
+        return {game: (rounds, wagered, net) for game, rounds, wagered, net in rows}
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
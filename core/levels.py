@@ -0,0 +1,45 @@
+# core/levels.py
+from bisect import bisect_right
+from math import isqrt
+
+# Die Levelkurve: Level L beginnt bei (10 · (L − 1))² XP — Level 1 bei 0, Level 2 bei 100, Level 3 bei 400 …
+CURVE_VERSION = 1  # Hochzählen, wenn sich die Kurve ändert; leveling.db wird dann beim Laden neu berechnet
+LEVEL_STEP = 10
+MAX_TABLE_LEVEL = 1000  # Darüber wird geschlossen gerechnet
+
+LEVELING_DB = "leveling.db"
+SQL_FUNCTION = "prime_level"  # In SQLite registrierte Fassung von level_for_xp
+
+
+def threshold(level):
+    # Mindest-XP für `level`
+    return (LEVEL_STEP * (level - 1)) ** 2
+
+
+THRESHOLDS = tuple(threshold(level) for level in range(1, MAX_TABLE_LEVEL + 1))
+
+
+def level_for_xp(xp):
+    xp = max(0, xp or 0)
+    if xp < THRESHOLDS[-1]:
+        return bisect_right(THRESHOLDS, xp)
+    return isqrt(xp) // LEVEL_STEP + 1
+
+
+def progress(xp):
+    # (Level, XP im aktuellen Level, XP vom aktuellen bis zum nächsten Level)
+    level = level_for_xp(xp)
+    start = threshold(level)
+    return level, xp - start, threshold(level + 1) - start
+
+
+async def register(db):
+    await db.create_function(SQL_FUNCTION, 1, level_for_xp)
+
+
+async def recompute_levels(db, path=LEVELING_DB):
+    # Ein UPDATE über die ganze Tabelle; geschrieben werden nur Zeilen, deren Level sich ändert
+    return await db.execute(
+        path,
+        f"UPDATE users SET level = {SQL_FUNCTION}(xp) WHERE level IS NOT {SQL_FUNCTION}(xp)"
+    )
@@ -0,0 +1,93 @@
+# core/limiter.py
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+# Befehl -> (Aufrufe, Sekunden): Token-Bucket mit `Aufrufe` als Burst, voll aufgefüllt nach `Sekunden`
+DEFAULT_LIMITS = {
+    "slots": (5, 10),
+    "roulette": (5, 10),
+    "duel": (3, 30),
+    "heist": (3, 60),
+    "xp": (1, 60),  # Eine XP-Vergabe pro Minute
+}
+LIMITER_MAX_BUCKETS = 50_000  # Obergrenze, falls sehr viele User gleichzeitig aktiv sind
+
+
+class Limiter:
+    def __init__(self, limits=None, maxsize=LIMITER_MAX_BUCKETS):
+        self.maxsize = maxsize
+        self.rules = {}  # key -> (Burst, Tokens pro Sekunde)
+        for key, (calls, per) in {**DEFAULT_LIMITS, **self._parse(limits)}.items():
+            self.configure(key, calls, per)
+        # (key, user_id) -> [tokens, zuletzt berechnet, wieder voll ab]; älteste Berührung vorne
+        self._buckets = OrderedDict()
+        self._locks = {}  # user_id -> [Lock, Anzahl Nutzer]
+
+    @staticmethod
+    def _parse(limits):
+        # config.json: "limits": {"slots": {"calls": 5, "per": 10}}
+        return {key: (rule["calls"], rule["per"]) for key, rule in (limits or {}).items()}
+
+    def configure(self, key, calls, per):
+        self.rules[key] = (calls, calls / per)
+
+    def refill_time(self, key):
+        burst, rate = self.rules[key]
+        return burst / rate
+
+    def seed(self, key, user_id, seconds_ago, now=None):
+        # Bucket so wiederherstellen, als wäre vor `seconds_ago` Sekunden ein Token verbraucht worden
+        burst, rate = self.rules[key]
+        now = time.monotonic() if now is None else now
+        tokens = burst - 1 + seconds_ago * rate
+        if tokens >= burst:
+            return
+        self._buckets[(key, user_id)] = [tokens, now, now + (burst - tokens) / rate]
+        self._buckets.move_to_end((key, user_id))
+
+    def _evict(self, now):
+        # Ein voll aufgefüllter Bucket ist gleichwertig mit keinem — vorne liegen die am längsten unberührten
+        buckets = self._buckets
+        while buckets:
+            bucket_key, bucket = next(iter(buckets.items()))
+            if bucket[2] > now and len(buckets) < self.maxsize:
+                break
+            del buckets[bucket_key]
+
+    def hit(self, key, user_id, now=None):
+        # 0.0 = erlaubt (ein Token verbraucht), sonst Sekunden bis zum nächsten freien Token
+        rule = self.rules.get(key)
+        if rule is None:
+            return 0.0
+        burst, rate = rule
+        now = time.monotonic() if now is None else now
+        self._evict(now)
+
+        bucket = self._buckets.get((key, user_id))
+        tokens = burst if bucket is None else min(burst, bucket[0] + (now - bucket[1]) * rate)
+        if tokens < 1:
+            return (1 - tokens) / rate
+        tokens -= 1
+        self._buckets[(key, user_id)] = [tokens, now, now + (burst - tokens) / rate]
+        self._buckets.move_to_end((key, user_id))
+        return 0.0
+
+    def __len__(self):
+        return len(self._buckets)
+
+    @asynccontextmanager
+    async def exclusive(self, user_id):
+        # Serialisiert parallele Befehle eines Users; der Lock verschwindet, sobald ihn niemand mehr hält
+        entry = self._locks.get(user_id)
+        if entry is None:
+            entry = self._locks[user_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[user_id]
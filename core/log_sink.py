@@ -0,0 +1,131 @@
+# core/log_sink.py
+import asyncio
+import logging
+import os
+import random
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+LOG_QUEUE_SIZE = 2000  # Zeilen, bevor neue INFO-Meldungen verworfen werden
+LOG_FLUSH_INTERVAL = 2.0  # Sekunden, die der Flusher Zeilen sammelt
+DISCORD_MESSAGE_LIMIT = 2000
+LOG_FILE = "logs/prime.log"
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUPS = 5
+
+LEVEL_EMOJIS = {"SUCCESS": "✅", "WARNING": "⚠️", "ERROR": "❌"}
+FILE_LEVELS = {"SUCCESS": logging.INFO, "INFO": logging.INFO, "WARNING": logging.WARNING, "ERROR": logging.ERROR}
+# Anteil der Meldungen je Level, die im Log-Channel landen (Datei und Konsole bekommen alles)
+DEFAULT_SAMPLE_RATES = {"INFO": 1.0, "SUCCESS": 1.0, "WARNING": 1.0, "ERROR": 1.0}
+
+
+class LogSink:
+    def __init__(self, bot, config=None):
+        config = config or {}
+        self.bot = bot
+        self.sample_rates = {**DEFAULT_SAMPLE_RATES, **config.get("sample_rates", {})}
+        self.flush_interval = config.get("flush_interval", LOG_FLUSH_INTERVAL)
+        self.queue = asyncio.Queue(maxsize=config.get("queue_size", LOG_QUEUE_SIZE))
+        self.dropped = 0
+        self._holding = []  # Vom Flusher bereits entnommene, noch nicht geschriebene Zeilen
+        self._task = None
+        self._closed = False
+
+        log_file = config.get("file", LOG_FILE)
+        os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+        self.file_logger = logging.getLogger("prime")
+        self.file_logger.setLevel(logging.INFO)
+        self.file_logger.propagate = False
+        if not self.file_logger.handlers:
+            handler = RotatingFileHandler(log_file, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self.file_logger.addHandler(handler)
+
+    async def log(self, message: str, level: str = "INFO"):
+        # Wird wie bisher als `await bot.log(...)` aufgerufen, kehrt aber sofort zurück
+        print(f"[{level}] {message}")
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        if self._closed:
+            # Nach dem Herunterfahren kein Flusher und kein Discord mehr — die Zeile geht direkt in die Datei
+            self.file_logger.log(FILE_LEVELS.get(level, logging.INFO), f"[{now}] [{level}] {message}")
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        try:
+            self.queue.put_nowait((now, level, message))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def _format(self, now, level, message):
+        emoji = LEVEL_EMOJIS.get(level, "ℹ️")
+        line = f"`[{now}]` {emoji} **{level}**: {message}"
+        if len(line) > DISCORD_MESSAGE_LIMIT:
+            line = line[:DISCORD_MESSAGE_LIMIT - 1] + "…"
+        return line
+
+    def _pack(self, lines):
+        # So viele Zeilen wie möglich pro Nachricht
+        messages = []
+        current = ""
+        for line in lines:
+            if current and len(current) + 1 + len(line) > DISCORD_MESSAGE_LIMIT:
+                messages.append(current)
+                current = line
+            else:
+                current = f"{current}\n{line}" if current else line
+        if current:
+            messages.append(current)
+        return messages
+
+    def _drain(self):
+        batch, self._holding = self._holding, []
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                return batch
+
+    async def _run(self):
+        while True:
+            self._holding.append(await self.queue.get())
+            await asyncio.sleep(self.flush_interval)
+            batch = self._drain()
+            if batch:
+                await self._write(batch)
+
+    async def _write(self, batch, send=True):
+        if self.dropped:
+            now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+            batch.append((now, "WARNING", f"{self.dropped} Log-Meldungen verworfen (Queue voll)."))
+            self.dropped = 0
+
+        channel_lines = []
+        for now, level, message in batch:
+            self.file_logger.log(FILE_LEVELS.get(level, logging.INFO), f"[{now}] [{level}] {message}")
+            if random.random() < self.sample_rates.get(level, 1.0):
+                channel_lines.append(self._format(now, level, message))
+
+        if not send or not channel_lines:
+            return
+        log_channel = self.bot.get_channel(self.bot.config["channels"]["log_channel"])
+        if not log_channel:
+            return
+        for content in self._pack(channel_lines):
+            try:
+                await log_channel.send(content)
+            except Exception as e:
+                print(f"[LOG FEHLER] Kann nicht in Log-Channel senden: {e}")
+
+    async def flush(self, send=True):
+        batch = self._drain()
+        if batch or self.dropped:
+            await self._write(batch, send=send)
+
+    async def close(self):
+        self._closed = True
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush(send=False)
+        for handler in self.file_logger.handlers:
+            handler.flush()
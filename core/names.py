@@ -0,0 +1,84 @@
+# core/names.py
+import asyncio
+import time
+from collections import OrderedDict
+
+import discord
+
+NAME_CACHE_SIZE = 4096  # Maximal gecachte Anzeigenamen (LRU)
+NAME_CACHE_TTL = 600  # Sekunden, bis ein Name neu geladen wird
+MAX_CONCURRENT_FETCHES = 5  # Parallele fetch_user-Aufrufe, damit wir im Rate-Limit bleiben
+
+
+class NameResolver:
+    def __init__(self, bot, maxsize=NAME_CACHE_SIZE, ttl=NAME_CACHE_TTL, concurrency=MAX_CONCURRENT_FETCHES):
+        self.bot = bot
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._cache = OrderedDict()  # user_id -> (expires_at, name or None)
+        self._inflight = {}  # user_id -> laufender Fetch-Task
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    def _get_cached(self, user_id):
+        entry = self._cache.get(user_id)
+        if entry is None:
+            return False, None
+        expires_at, name = entry
+        if expires_at < time.monotonic():
+            del self._cache[user_id]
+            return False, None
+        self._cache.move_to_end(user_id)
+        return True, name
+
+    def _store(self, user_id, name):
+        self._cache[user_id] = (time.monotonic() + self.ttl, name)
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    async def _fetch(self, user_id):
+        async with self._semaphore:
+            try:
+                user = await self.bot.fetch_user(user_id)
+            except discord.NotFound:
+                # Gelöschte Accounts merken, damit wir nicht jedes Mal nachfragen
+                self._store(user_id, None)
+                return None
+            except discord.HTTPException:
+                return None
+        self._store(user_id, user.display_name)
+        return user.display_name
+
+    async def resolve_many(self, user_ids, fallbacks=None):
+        fallbacks = fallbacks or {}
+        names = {}
+        tasks = {}
+        for user_id in dict.fromkeys(user_ids):
+            user = self.bot.get_user(user_id)
+            if user:
+                names[user_id] = user.display_name
+                continue
+            found, name = self._get_cached(user_id)
+            if found:
+                names[user_id] = name
+                continue
+            task = self._inflight.get(user_id)
+            if task is None:
+                task = asyncio.ensure_future(self._fetch(user_id))
+                self._inflight[user_id] = task
+                task.add_done_callback(lambda _, user_id=user_id: self._inflight.pop(user_id, None))
+            tasks[user_id] = task
+
+        if tasks:
+            results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+            for user_id, result in zip(tasks, results):
+                names[user_id] = None if isinstance(result, BaseException) else result
+
+        return {
+            user_id: names.get(user_id) or fallbacks.get(user_id) or f"User {user_id}"
+            for user_id in names
+        }
+
+    async def resolve(self, user_id, fallback=None):
+        names = await self.resolve_many([user_id], {user_id: fallback} if fallback else None)
+        return names[user_id]
@@ -0,0 +1,73 @@
+# core/payouts.py
+import random
+from itertools import product
+
+# Reine Auszahlungsregeln — von den Cogs und vom RTP-Simulator (tools/rtp_simulator.py) gemeinsam genutzt
+SLOT_SYMBOLS = ("🍒", "🍋", "🍊", "🍇", "💎", "7️⃣")
+SLOT_TRIPLE_MULTIPLIERS = {"7️⃣": 10, "💎": 5}
+SLOT_TRIPLE_DEFAULT = 3
+SLOT_PAIR_MULTIPLIER = 2
+
+ROULETTE_NUMBERS = range(37)
+ROULETTE_RED = frozenset({1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36})
+ROULETTE_BLACK = frozenset(ROULETTE_NUMBERS) - ROULETTE_RED - {0}
+ROULETTE_NUMBER_MULTIPLIER = 35
+ROULETTE_EVEN_MONEY_MULTIPLIER = 2
+
+# Wette -> (gewinnende Zahlen, Multiplikator)
+ROULETTE_BETS = {
+    "rot": (ROULETTE_RED, ROULETTE_EVEN_MONEY_MULTIPLIER),
+    "schwarz": (ROULETTE_BLACK, ROULETTE_EVEN_MONEY_MULTIPLIER),
+    "grün": (frozenset({0}), ROULETTE_EVEN_MONEY_MULTIPLIER),
+    "gerade": (frozenset(n for n in ROULETTE_NUMBERS if n and n % 2 == 0), ROULETTE_EVEN_MONEY_MULTIPLIER),
+    "ungerade": (frozenset(n for n in ROULETTE_NUMBERS if n % 2 == 1), ROULETTE_EVEN_MONEY_MULTIPLIER),
+    **{str(n): (frozenset({n}), ROULETTE_NUMBER_MULTIPLIER) for n in ROULETTE_NUMBERS},
+}
+
+
+def slots_multiplier(spin):
+    if spin[0] == spin[1] == spin[2]:
+        return SLOT_TRIPLE_MULTIPLIERS.get(spin[0], SLOT_TRIPLE_DEFAULT)
+    if spin[0] == spin[1] or spin[1] == spin[2] or spin[0] == spin[2]:
+        return SLOT_PAIR_MULTIPLIER
+    return 0
+
+
+# Vorberechnete Tabellen: eine Auswertung ist ein Dict- bzw. Tupel-Zugriff
+SLOT_PAYTABLE = {spin: slots_multiplier(spin) for spin in product(SLOT_SYMBOLS, repeat=3)}
+ROULETTE_PAYTABLE = {
+    wager: tuple(multiplier if number in numbers else 0 for number in ROULETTE_NUMBERS)
+    for wager, (numbers, multiplier) in ROULETTE_BETS.items()
+}
+
+
+def spin_slots(rng=random):
+    return tuple(rng.choice(SLOT_SYMBOLS) for _ in range(3))
+
+
+def slots_payout(spin, bet):
+    return bet * SLOT_PAYTABLE[tuple(spin)]
+
+
+def spin_roulette(rng=random):
+    return rng.randint(0, 36)
+
+
+def roulette_color(number):
+    return "grün" if number == 0 else "rot" if number in ROULETTE_RED else "schwarz"
+
+
+def normalize_wager(wager):
+    # "07" -> "7"; unbekannte Wetten liefern None
+    wager = wager.lower()
+    if wager.isdigit():
+        wager = str(int(wager))
+    return wager if wager in ROULETTE_PAYTABLE else None
+
+
+def roulette_multiplier(number, wager):
+    return ROULETTE_PAYTABLE[wager][number]
+
+
+def roulette_payout(number, wager, bet):
+    return bet * roulette_multiplier(number, wager)
@@ -0,0 +1,111 @@
+# core/scheduler.py
+import asyncio
+from datetime import datetime, timedelta
+
+MAX_SLEEP = 3600  # Sekunden — lange Wartezeiten werden in Etappen geschlafen und neu berechnet
+
+
+def daily_at(hour, minute=0):
+    def trigger(after):
+        candidate = after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if candidate <= after:
+            candidate += timedelta(days=1)
+        return candidate
+    return trigger
+
+
+def weekly_at(weekday, hour, minute=0):
+    def trigger(after):
+        candidate = after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        candidate += timedelta(days=(weekday - candidate.weekday()) % 7)
+        if candidate <= after:
+            candidate += timedelta(days=7)
+        return candidate
+    return trigger
+
+
+def hourly_at(minute=0):
+    def trigger(after):
+        candidate = after.replace(minute=minute, second=0, microsecond=0)
+        if candidate <= after:
+            candidate += timedelta(hours=1)
+        return candidate
+    return trigger
+
+
+class Scheduler:
+    def __init__(self, bot, path="scheduler.db"):
+        self.bot = bot
+        self.path = path
+        self.jobs = {}  # name -> asyncio.Task
+        self.last_runs = None  # name -> datetime des zuletzt abgeschlossenen Laufs
+
+    async def _load(self):
+        if self.last_runs is not None:
+            return
+        await self.bot.db.execute(self.path, "CREATE TABLE IF NOT EXISTS job_runs (job TEXT PRIMARY KEY, last_run TEXT NOT NULL)")
+        rows = await self.bot.db.fetchall(self.path, "SELECT job, last_run FROM job_runs")
+        self.last_runs = {job: datetime.fromisoformat(last_run) for job, last_run in rows}
+
+    async def _record(self, name, run_time):
+        self.last_runs[name] = run_time
+        await self.bot.db.execute(
+            self.path,
+            "INSERT INTO job_runs (job, last_run) VALUES (?, ?) ON CONFLICT(job) DO UPDATE SET last_run = excluded.last_run",
+            (name, run_time.isoformat())
+        )
+
+    async def schedule(self, name, trigger, callback, catch_up=None):
+        # catch_up: timedelta, wie weit ein verpasster Lauf nachgeholt wird (None = gar nicht)
+        await self._load()
+        self.cancel(name)
+        self.jobs[name] = asyncio.create_task(self._run(name, trigger, callback, catch_up))
+
+    def cancel(self, name):
+        task = self.jobs.pop(name, None)
+        if task:
+            task.cancel()
+
+    def cancel_all(self):
+        for name in list(self.jobs):
+            self.cancel(name)
+
+    def next_run(self, name, trigger, now):
+        last_run = self.last_runs.get(name)
+        if last_run is None:
+            return trigger(now), False
+        due = trigger(last_run)
+        if due > now:
+            return due, False
+        # Verpasste Läufe zusammenfassen: nur der jüngste wird nachgeholt
+        while True:
+            following = trigger(due)
+            if following > now:
+                return due, True
+            due = following
+
+    async def _run(self, name, trigger, callback, catch_up):
+        await self.bot.wait_until_ready()
+        now = datetime.utcnow()
+        due, missed = self.next_run(name, trigger, now)
+        if missed and (catch_up is None or now - due > catch_up):
+            due = trigger(now)
+        elif missed:
+            await self.bot.log(f"Scheduler: verpasster Lauf '{name}' ({due:%d.%m. %H:%M}) wird nachgeholt.", "WARNING")
+
+        while True:
+            delay = (due - datetime.utcnow()).total_seconds()
+            while delay > 0:
+                await asyncio.sleep(min(delay, MAX_SLEEP))
+                delay = (due - datetime.utcnow()).total_seconds()
+
+            try:
+                await callback(due)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Nicht als erledigt speichern, damit ein Neustart den Lauf nachholen kann
+                await self.bot.log(f"Scheduler: Job '{name}' fehlgeschlagen: {e}", "ERROR")
+            else:
+                await self._record(name, due)
+            due = trigger(max(due, datetime.utcnow()))
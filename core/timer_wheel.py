@@ -0,0 +1,76 @@
+# core/timer_wheel.py
+import asyncio
+import math
+
+
+class TimerWheel:
+    # Ein Task für beliebig viele Timeouts: Einträge liegen in Slots, jeder Tick arbeitet genau einen Slot ab
+    def __init__(self, tick=1.0, slots=60):
+        self.tick = tick
+        self.slots = slots
+        self._wheel = [{} for _ in range(slots)]  # key -> [verbleibende Umdrehungen, callback]
+        self._where = {}  # key -> slot
+        self._cursor = 0
+        self._task = None
+        self._callbacks = set()
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, key):
+        return key in self._where
+
+    def schedule(self, key, delay, callback):
+        self.cancel(key)
+        ticks = max(1, math.ceil(delay / self.tick))
+        slot = (self._cursor + ticks) % self.slots
+        self._wheel[slot][key] = [(ticks - 1) // self.slots, callback]
+        self._where[key] = slot
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def cancel(self, key):
+        slot = self._where.pop(key, None)
+        if slot is None:
+            return False
+        del self._wheel[slot][key]
+        return True
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while self._where:
+            next_tick += self.tick
+            await asyncio.sleep(max(0, next_tick - loop.time()))
+            self._cursor = (self._cursor + 1) % self.slots
+            bucket = self._wheel[self._cursor]
+            due = []
+            for key, entry in list(bucket.items()):
+                if entry[0]:
+                    entry[0] -= 1
+                else:
+                    del bucket[key]
+                    del self._where[key]
+                    due.append(entry[1])
+            for callback in due:
+                self._fire(callback)
+        self._task = None
+
+    def _fire(self, callback):
+        try:
+            result = callback()
+        except Exception as e:
+            print(f"[TIMER FEHLER] {e}")
+            return
+        if asyncio.iscoroutine(result):
+            task = asyncio.create_task(result)
+            self._callbacks.add(task)
+            task.add_done_callback(self._callbacks.discard)
+
+    def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for bucket in self._wheel:
+            bucket.clear()
+        self._where.clear()
@@ -0,0 +1,157 @@
+# core/twitch.py
+import asyncio
+import time
+
+import aiohttp
+
+TOKEN_URL = "https://id.twitch.tv/oauth2/token"
+HELIX_URL = "https://api.twitch.tv/helix"
+HELIX_BATCH_SIZE = 100  # Helix akzeptiert höchstens 100 user_login pro Request
+MAX_CONCURRENT_REQUESTS = 4
+MAX_ATTEMPTS = 3
+REQUEST_TIMEOUT = 15  # Sekunden
+
+
+class TwitchAPIError(Exception):
+    def __init__(self, status, message=""):
+        super().__init__(f"Twitch API-Fehler: {status} {message}".strip())
+        self.status = status
+
+
+class TwitchClient:
+    def __init__(self, client_id, client_secret, log, helix_url=HELIX_URL, token_url=TOKEN_URL):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.log = log
+        self.helix_url = helix_url
+        self.token_url = token_url
+        self.access_token = None
+        self.ratelimit_remaining = None
+        self.ratelimit_reset = None  # Unix-Zeitstempel aus Ratelimit-Reset
+        self._session = None
+        self._token_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT))
+        return self._session
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def get_access_token(self, expired=None):
+        # expired: der Token, der gerade mit 401 abgelehnt wurde
+        async with self._token_lock:
+            if self.access_token and self.access_token != expired:
+                return self.access_token
+            self.access_token = None
+            params = {
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "grant_type": "client_credentials"
+            }
+            async with self.session.post(self.token_url, params=params) as resp:
+                data = await resp.json(content_type=None)
+                if resp.status != 200:
+                    await self.log(f"Twitch Token-Fehler: {data}", "ERROR")
+                    raise TwitchAPIError(resp.status, "Token konnte nicht abgerufen werden")
+            self.access_token = data["access_token"]
+            await self.log("Twitch Access Token erhalten.", "SUCCESS")
+            return self.access_token
+
+    def _update_ratelimit(self, headers):
+        remaining = headers.get("Ratelimit-Remaining")
+        reset = headers.get("Ratelimit-Reset")
+        if remaining is not None and remaining.isdigit():
+            self.ratelimit_remaining = int(remaining)
+        if reset is not None and reset.isdigit():
+            self.ratelimit_reset = int(reset)
+
+    async def _wait_for_ratelimit(self):
+        if self.ratelimit_remaining == 0 and self.ratelimit_reset:
+            delay = self.ratelimit_reset - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.ratelimit_remaining = None
+
+    async def get(self, path, params):
+        async with self._semaphore:
+            token = await self.get_access_token()
+            for attempt in range(MAX_ATTEMPTS):
+                await self._wait_for_ratelimit()
+                headers = {
+                    "Client-ID": self.client_id,
+                    "Authorization": f"Bearer {token}"
+                }
+                async with self.session.get(f"{self.helix_url}{path}", headers=headers, params=params) as resp:
+                    self._update_ratelimit(resp.headers)
+                    if resp.status == 200:
+                        return await resp.json()
+                    if resp.status == 401:
+                        # Token abgelaufen oder widerrufen — neu holen und erneut versuchen
+                        token = await self.get_access_token(expired=token)
+                        continue
+                    if resp.status == 429:
+                        self.ratelimit_remaining = 0
+                        if not self.ratelimit_reset or self.ratelimit_reset <= time.time():
+                            self.ratelimit_reset = int(time.time()) + 1
+                        continue
+                    raise TwitchAPIError(resp.status)
+            raise TwitchAPIError(resp.status, f"nach {MAX_ATTEMPTS} Versuchen")
+
+    async def fetch_streams(self, logins):
+        logins = list(dict.fromkeys(logins))
+        batches = [logins[i:i + HELIX_BATCH_SIZE] for i in range(0, len(logins), HELIX_BATCH_SIZE)]
+        results = await asyncio.gather(
+            *(self.get("/streams", [("user_login", login) for login in batch] + [("first", str(HELIX_BATCH_SIZE))]) for batch in batches)
+        )
+        return [stream for data in results for stream in data.get("data", [])]
+
+
+class WatchList:
+    # Überwachte Streamer, doppelt indiziert — der Poll-Loop braucht keine Datenbank
+    def __init__(self):
+        self.by_login = {}  # streamer_login -> {guild_id: alert_channel_id}
+        self.by_guild = {}  # guild_id -> {streamer_login: alert_channel_id}
+
+    def __len__(self):
+        return sum(len(streamers) for streamers in self.by_guild.values())
+
+    def load(self, rows):
+        self.by_login = {}
+        self.by_guild = {}
+        for guild_id, streamer_login, alert_channel_id in rows:
+            self.add(guild_id, streamer_login, alert_channel_id)
+
+    def contains(self, guild_id, streamer_login):
+        return streamer_login in self.by_guild.get(guild_id, {})
+
+    def add(self, guild_id, streamer_login, alert_channel_id):
+        self.by_login.setdefault(streamer_login, {})[guild_id] = alert_channel_id
+        self.by_guild.setdefault(guild_id, {})[streamer_login] = alert_channel_id
+
+    def remove(self, guild_id, streamer_login):
+        guild_streamers = self.by_guild.get(guild_id)
+        if not guild_streamers or streamer_login not in guild_streamers:
+            return False
+        del guild_streamers[streamer_login]
+        if not guild_streamers:
+            del self.by_guild[guild_id]
+        watchers = self.by_login[streamer_login]
+        del watchers[guild_id]
+        if not watchers:
+            del self.by_login[streamer_login]
+        return True
+
+    def logins(self):
+        return list(self.by_login)
+
+    def watchers(self, streamer_login):
+        return self.by_login.get(streamer_login, {})
+
+    def for_guild(self, guild_id):
+        return self.by_guild.get(guild_id, {})
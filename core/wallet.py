@@ -0,0 +1,125 @@
+# core/wallet.py
+from contextlib import asynccontextmanager
+
+ECONOMY_DB = "economy.db"
+
+DEBIT_SQL = "UPDATE coins SET balance = balance - ? WHERE user_id = ? AND balance >= ? RETURNING balance"
+CREDIT_SQL = "INSERT INTO coins (user_id, balance) VALUES (?, ?) ON CONFLICT(user_id) DO UPDATE SET balance = balance + excluded.balance RETURNING balance"
+SETTLE_SQL = "UPDATE coins SET balance = balance - ? + ? WHERE user_id = ? AND balance >= ? RETURNING balance"
+
+
+class _Abort(Exception):
+    # Nur intern: Booking.abort() rollt die Transaktion zurück, ohne dass der Aufrufer etwas fangen muss
+    pass
+
+
+class Booking:
+    # Mehrere Buchungen in einer offenen Transaktion; `db` erlaubt eigene Statements im selben Commit
+    def __init__(self, db):
+        self.db = db
+        self.entries = []  # (user_id, amount, balance, wagered)
+
+    async def debit(self, user_id, amount):
+        async with self.db.execute(DEBIT_SQL, (amount, user_id, amount)) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        self.entries.append((user_id, -amount, row[0], amount))
+        return row[0]
+
+    async def credit(self, user_id, amount):
+        async with self.db.execute(CREDIT_SQL, (user_id, amount)) as cursor:
+            row = await cursor.fetchone()
+        self.entries.append((user_id, amount, row[0], 0))
+        return row[0]
+
+    async def clear(self, user_id, delete=False):
+        # Kontostand auf 0 (oder Zeile löschen); der alte Stand geht als Gegenbuchung ins Ledger. None = kein Konto
+        if delete:
+            async with self.db.execute("DELETE FROM coins WHERE user_id = ? RETURNING balance", (user_id,)) as cursor:
+                row = await cursor.fetchone()
+        else:
+            async with self.db.execute("SELECT balance FROM coins WHERE user_id = ?", (user_id,)) as cursor:
+                row = await cursor.fetchone()
+            if row and row[0]:
+                await self.db.execute("UPDATE coins SET balance = 0 WHERE user_id = ?", (user_id,))
+        if row is None:
+            return None
+        if row[0]:
+            self.entries.append((user_id, -row[0], 0, 0))
+        return row[0]
+
+    def abort(self):
+        self.entries = []
+        raise _Abort()
+
+
+class Wallet:
+    # Jede Buchung ist ein bedingtes UPDATE — Prüfen und Abziehen können sich nicht überholen
+    def __init__(self, db, leaderboards, ledger, path=ECONOMY_DB):
+        self.db = db
+        self.leaderboards = leaderboards
+        self.ledger = ledger
+        self.path = path
+
+    def _track(self, user_id, row, game, amount, wagered=0):
+        if row is None:
+            return None
+        self.leaderboards.coins.update(user_id, row[0])
+        self.ledger.record(user_id, game, amount, row[0], wagered)
+        return row[0]
+
+    async def debit_if_sufficient(self, user_id, amount, game):
+        # Neuer Kontostand oder None, wenn das Guthaben nicht reicht; Abbuchungen sind immer Einsätze
+        row = await self.db.execute_returning(self.path, DEBIT_SQL, (amount, user_id, amount))
+        return self._track(user_id, row, game, -amount, amount)
+
+    async def credit(self, user_id, amount, game):
+        row = await self.db.execute_returning(self.path, CREDIT_SQL, (user_id, amount))
+        return self._track(user_id, row, game, amount)
+
+    async def settle_bet(self, user_id, stake, payout, game):
+        # Einsatz abziehen und Gewinn gutschreiben in einem Statement; None = nicht genug Coins
+        row = await self.db.execute_returning(self.path, SETTLE_SQL, (stake, payout, user_id, stake))
+        return self._track(user_id, row, game, payout - stake, stake)
+
+    @asynccontextmanager
+    async def booking(self, game):
+        # Index und Ledger werden erst nach erfolgreichem Commit nachgezogen
+        try:
+            async with self.db.transaction(self.path) as db:
+                booking = Booking(db)
+                yield booking
+        except _Abort:
+            return
+        for user_id, amount, balance, wagered in booking.entries:
+            self._track(user_id, (balance,), game, amount, wagered)
+
+    async def debit_all(self, user_ids, amount, game):
+        # Alle oder keiner: (Kontostände, None) oder ({}, user_id des ersten, der nicht zahlen kann)
+        balances = {}
+        broke = None
+        async with self.booking(game) as booking:
+            for user_id in user_ids:
+                balance = await booking.debit(user_id, amount)
+                if balance is None:
+                    broke = user_id
+                    booking.abort()
+                balances[user_id] = balance
+        if broke is not None:
+            return {}, broke
+        return balances, None
+
+    async def clear_many(self, user_ids, game, delete=False):
+        # Alle Konten in einer Transaktion leeren; user_id -> alter Kontostand (None = kein Konto)
+        async with self.booking(game) as booking:
+            cleared = {user_id: await booking.clear(user_id, delete) for user_id in user_ids}
+        if delete:
+            for user_id in user_ids:
+                self.leaderboards.coins.remove(user_id)
+        return cleared
+
+    async def credit_many(self, amounts, game):
+        # user_id -> Betrag, alles in einer Transaktion
+        async with self.booking(game) as booking:
+            return {user_id: await booking.credit(user_id, amount) for user_id, amount in amounts.items()}
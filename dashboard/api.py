@@ -0,0 +1,84 @@
+# dashboard/api.py
+import asyncio
+
+import aiohttp.web as web
+
+from core.dashboard_data import API_SECTIONS, RESYNC, SnapshotUnavailable, sections_event
+from dashboard.assets import accepted_encodings
+
+API_PREFIX = "/api/v1"
+SSE_HEARTBEAT = 20  # Sekunden; hält Proxys und den Browser-Timeout bei ruhigem Server fern
+
+
+async def current_snapshot(source):
+    # Im separaten Prozess gibt es erst einen Snapshot, wenn der Bot die Datei geschrieben hat
+    try:
+        return await source.get()
+    except SnapshotUnavailable:
+        raise web.HTTPServiceUnavailable(text="Dashboard-Daten sind noch nicht verfügbar.", headers={"Retry-After": "5"})
+
+
+async def section_handler(request):
+    # JSON kommt fertig serialisiert und komprimiert aus dem Snapshot — pro Request nur Header
+    name = request.match_info["section"]
+    if name not in API_SECTIONS:
+        raise web.HTTPNotFound()
+    snapshot = await current_snapshot(request.app["dashboard_source"])
+    section = snapshot.api[name]
+    headers = {
+        "ETag": section.etag,
+        "Last-Modified": snapshot.built_at.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding"
+    }
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match and (section.etag in if_none_match or if_none_match.strip() == "*"):
+        return web.Response(status=304, headers=headers)
+    if "gzip" in accepted_encodings(request):
+        headers["Content-Encoding"] = "gzip"
+        return web.Response(body=section.gzip, content_type="application/json", charset="utf-8", headers=headers)
+    return web.Response(body=section.body, content_type="application/json", charset="utf-8", headers=headers)
+
+
+async def send_event(response, event, etag, data):
+    await response.write(b"event: " + event + b"\nid: " + etag.encode() + b"\ndata: " + data + b"\n\n")
+
+
+async def events_handler(request):
+    # Server-Sent Events: erst der komplette Stand, danach nur Abschnitte, die sich geändert haben
+    source = request.app["dashboard_source"]
+    snapshot = await current_snapshot(source)
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+    await response.prepare(request)
+    queue = source.subscribe()
+    try:
+        # Nach einem Reconnect mit aktuellem Stand gibt es nichts nachzuholen
+        if request.headers.get("Last-Event-ID") != snapshot.etag:
+            await send_event(response, b"snapshot", snapshot.etag, sections_event(snapshot.api, API_SECTIONS))
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), SSE_HEARTBEAT)
+            except asyncio.TimeoutError:
+                await response.write(b": ping\n\n")
+                continue
+            if event is RESYNC:
+                snapshot = source.current
+                await send_event(response, b"snapshot", snapshot.etag, sections_event(snapshot.api, API_SECTIONS))
+            else:
+                await send_event(response, b"update", *event)
+    except ConnectionError:
+        pass
+    finally:
+        source.unsubscribe(queue)
+    return response
+
+
+def setup_api(app, source):
+    # source: eine SnapshotSource — im Bot-Prozess bot.dashboard, im separaten Prozess eine FileSnapshotSource
+    app["dashboard_source"] = source
+    app.router.add_get(API_PREFIX + "/events", events_handler)
+    app.router.add_get(API_PREFIX + "/{section}", section_handler)
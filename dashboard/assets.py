@@ -0,0 +1,96 @@
+# dashboard/assets.py
+import gzip
+import hashlib
+import mimetypes
+import os
+from collections import namedtuple
+
+import aiohttp.web as web
+
+try:
+    import brotli
+except ImportError:
+    brotli = None  # Optional — ohne brotli gibt es nur die gzip-Fassung
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+IMMUTABLE = "public, max-age=31536000, immutable"  # Name enthält den Hash, der Inhalt ändert sich also nie
+COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+# body, gzip und br sind fertig im Speicher; br ist None ohne brotli-Modul, gzip/br None bei Binärdateien
+Asset = namedtuple("Asset", "name hashed_name content_type etag body gzip br")
+
+
+def accepted_encodings(request):
+    accepted = set()
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticAssets:
+    # Liest dashboard/static einmal beim Start: Hash im Dateinamen, Kompression vorab, Auslieferung aus dem Speicher
+    def __init__(self, directory=STATIC_DIR, prefix="/static"):
+        self.directory = directory
+        self.prefix = prefix
+        self.by_name = {}
+        self.by_hashed_name = {}
+
+    def load(self):
+        for root, _, files in os.walk(self.directory):
+            for filename in sorted(files):
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, self.directory).replace(os.sep, "/")
+                with open(path, "rb") as f:
+                    self.add(name, f.read())
+        return self
+
+    def add(self, name, body):
+        digest = hashlib.sha256(body).hexdigest()[:12]
+        stem, ext = os.path.splitext(name)
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        compressed_gzip = compressed_br = None
+        if content_type.startswith(COMPRESSIBLE):
+            # mtime=0: gleiche Bytes in jedem Worker-Prozess
+            compressed_gzip = gzip.compress(body, 9, mtime=0)
+            if brotli:
+                compressed_br = brotli.compress(body, quality=11)
+        asset = Asset(name, f"{stem}.{digest}{ext}", content_type, f'"{digest}"', body, compressed_gzip, compressed_br)
+        self.by_name[name] = asset
+        self.by_hashed_name[asset.hashed_name] = asset
+        return asset
+
+    def url(self, name):
+        # Für Templates: {{ static_url("style.css") }} -> /static/style.<hash>.css
+        asset = self.by_name.get(name)
+        return f"{self.prefix}/{asset.hashed_name if asset else name}"
+
+    async def handler(self, request):
+        filename = request.match_info["filename"]
+        asset = self.by_hashed_name.get(filename)
+        if asset:
+            cache_control = IMMUTABLE
+        else:
+            # Alter Name ohne Hash: noch ausliefern, aber jedes Mal revalidieren
+            asset = self.by_name.get(filename)
+            if asset is None:
+                raise web.HTTPNotFound()
+            cache_control = "no-cache"
+
+        headers = {"ETag": asset.etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match and (asset.etag in if_none_match or if_none_match.strip() == "*"):
+            return web.Response(status=304, headers=headers)
+
+        body = asset.body
+        accepted = accepted_encodings(request)
+        if asset.br and "br" in accepted:
+            body, headers["Content-Encoding"] = asset.br, "br"
+        elif asset.gzip and "gzip" in accepted:
+            body, headers["Content-Encoding"] = asset.gzip, "gzip"
+        charset = "utf-8" if asset.content_type.startswith("text/") else None
+        return web.Response(body=body, content_type=asset.content_type, charset=charset, headers=headers)
+
+    def setup(self, app):
+        app.router.add_get(self.prefix + "/{filename:.+}", self.handler)
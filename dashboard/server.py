@@ -0,0 +1,265 @@
+# dashboard/server.py
+# Web-Dashboard. Läuft entweder im Bot-Prozess (DASHBOARD_MODE=inline, Standard) oder eigenständig,
+# dann liest es den Snapshot, den der Bot mit DASHBOARD_MODE=process ablegt:
+#   python -m dashboard.server --workers 4
+import argparse
+import hashlib
+import hmac
+import multiprocessing
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+import aiohttp.web as web
+import aiohttp_jinja2
+import jinja2
+
+from core.admin_jobs import USER_JOB_KINDS, AdminJobQueue, parse_twitch_logins, parse_user_ids
+from core.dashboard_data import FileSnapshotSource
+from core.database import Database
+from dashboard.api import current_snapshot, setup_api
+from dashboard.assets import StaticAssets
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+# Kompilierte Templates; mehrere Worker teilen sich das Verzeichnis, Jinja schreibt die Dateien atomar
+TEMPLATE_CACHE_DIR = os.getenv("DASHBOARD_TEMPLATE_CACHE", os.path.join(os.path.dirname(TEMPLATE_DIR), ".template_cache"))
+DEFAULT_SNAPSHOT_PATH = "dashboard_snapshot.json"
+SESSION_MAX_AGE = 3600
+MAX_FORM_SIZE = 4 * 1024 ** 2  # Bulk-Importe mit vielen tausend IDs passen nicht in aiohttps Standard von 1 MiB
+
+
+def format_uptime(started_at):
+    return str(datetime.now(timezone.utc) - datetime.fromisoformat(started_at)).split(".")[0]
+
+
+# Admin-Sitzung als signiertes Cookie statt Server-Set — gilt damit in jedem Worker-Prozess
+def sign_session(password, expires):
+    return hmac.new(password.encode(), str(expires).encode(), hashlib.sha256).hexdigest()
+
+
+def make_session(password):
+    expires = int(time.time()) + SESSION_MAX_AGE
+    return f"{expires}.{sign_session(password, expires)}"
+
+
+def valid_session(password, value):
+    if not password or not value:
+        return False
+    expires, _, signature = value.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, sign_session(password, expires))
+
+
+def is_admin(request):
+    return valid_session(request.app["admin_password"], request.cookies.get("admin_session"))
+
+
+async def login_handler(request):
+    if request.method == "POST":
+        data = await request.post()
+        password = request.app["admin_password"]
+        if password and hmac.compare_digest(data.get("password", ""), password):
+            response = web.HTTPFound("/admin")
+            response.set_cookie("admin_session", make_session(password), max_age=SESSION_MAX_AGE, httponly=True, samesite="Lax")
+            return response
+        context = {"error": "Falsches Passwort!", "now": datetime.now(timezone.utc)}
+        return await aiohttp_jinja2.render_template_async("login.html", request, context)
+    return await aiohttp_jinja2.render_template_async("login.html", request, {"now": datetime.now(timezone.utc)})
+
+
+async def admin_handler(request):
+    if not is_admin(request):
+        return web.HTTPFound("/login")
+
+    # Server-Liste und Startzeit kommen aus dem Snapshot — der Dashboard-Prozess hat keine Discord-Verbindung
+    data = (await current_snapshot(request.app["dashboard_source"])).data
+    guilds = data["guilds"]
+    context = {
+        "guilds": guilds,
+        "uptime": format_uptime(data["started_at"]),
+        "server_name": guilds[0]["name"] if guilds else "Kein Server",
+        "python_version": sys.version,
+        "jobs": await request.app["admin_jobs"].recent(),
+        "error": request.query.get("error")
+    }
+    return await aiohttp_jinja2.render_template_async("admin.html", request, context)
+
+
+def wants_json(request):
+    return "application/json" in request.headers.get("Accept", "")
+
+
+def job_response(request, job_id=None, error=None):
+    # Formulare bekommen eine Weiterleitung zurück ins Panel, Skripte JSON mit der Status-URL
+    if wants_json(request):
+        if error:
+            return web.json_response({"error": error}, status=400)
+        return web.json_response({"job_id": job_id, "status_url": f"/admin/jobs/{job_id}"}, status=202)
+    if error:
+        return web.HTTPFound("/admin?" + urlencode({"error": error}))
+    return web.HTTPFound(f"/admin?job={job_id}#jobs")
+
+
+async def twitch_add_handler(request):
+    # Ein Streamer oder viele auf einmal (streamer_names: durch Komma oder Zeilenumbruch getrennt)
+    if not is_admin(request):
+        return web.HTTPFound("/login")
+    data = await request.post()
+    logins, skipped = parse_twitch_logins(data.get("streamer_name"), data.get("streamer_names"))
+    guild_id = data.get("guild_id", "")
+    if not guild_id.isdigit():
+        return job_response(request, error="Bitte einen Server auswählen.")
+    if not logins:
+        return job_response(request, error="Keine gültigen Twitch-Namen angegeben.")
+    job_id = await request.app["admin_jobs"].enqueue(
+        "twitch_add", {"guild_id": int(guild_id), "logins": logins, "skipped": skipped}, len(logins)
+    )
+    return job_response(request, job_id)
+
+
+async def user_reset_handler(request):
+    # Eine User-ID oder eine ganze Liste (user_ids) — die Arbeit macht der Bot im Hintergrund
+    if not is_admin(request):
+        return web.HTTPFound("/login")
+    data = await request.post()
+    action = data.get("action")
+    if action not in USER_JOB_KINDS:
+        return job_response(request, error="Unbekannte Aktion.")
+    user_ids, skipped = parse_user_ids(data.get("user_id"), data.get("user_ids"))
+    if not user_ids:
+        return job_response(request, error="Keine gültigen User-IDs angegeben.")
+    job_id = await request.app["admin_jobs"].enqueue(action, {"user_ids": user_ids, "skipped": skipped}, len(user_ids))
+    return job_response(request, job_id)
+
+
+async def jobs_handler(request):
+    if not is_admin(request):
+        raise web.HTTPUnauthorized()
+    return web.json_response(await request.app["admin_jobs"].recent())
+
+
+async def job_handler(request):
+    if not is_admin(request):
+        raise web.HTTPUnauthorized()
+    job = await request.app["admin_jobs"].get(int(request.match_info["job_id"]))
+    if job is None:
+        raise web.HTTPNotFound()
+    return web.json_response(job)
+
+
+async def logout_handler(request):
+    response = web.HTTPFound("/")
+    response.del_cookie("admin_session")
+    return response
+
+
+async def dashboard_handler(request):
+    # Kein Datenbank- oder Discord-Zugriff pro Request: nur der fertige Snapshot
+    snapshot = await current_snapshot(request.app["dashboard_source"])
+    headers = {
+        "ETag": snapshot.etag,
+        "Last-Modified": snapshot.built_at.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+        "Cache-Control": "no-cache"
+    }
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        if snapshot.etag in if_none_match or if_none_match.strip() == "*":
+            return web.Response(status=304, headers=headers)
+    elif request.if_modified_since and request.if_modified_since >= snapshot.built_at:
+        return web.Response(status=304, headers=headers)
+    return web.Response(body=snapshot.html, content_type="text/html", charset="utf-8", headers=headers)
+
+
+def setup_templates(app, assets):
+    os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+    env = aiohttp_jinja2.setup(
+        app,
+        loader=jinja2.FileSystemLoader(TEMPLATE_DIR),
+        bytecode_cache=jinja2.FileSystemBytecodeCache(TEMPLATE_CACHE_DIR),
+        enable_async=True,
+        auto_reload=False  # Templates ändern sich nur mit einem Deploy, also kein stat() pro Render
+    )
+    env.globals["static_url"] = assets.url
+    # Alles beim Start kompilieren — nach dem ersten Lauf kommt der Bytecode aus dem Cache
+    for name in env.list_templates(extensions=["html"]):
+        env.get_template(name)
+    return env
+
+
+def create_app(source, admin_password, admin_jobs):
+    app = web.Application(client_max_size=MAX_FORM_SIZE)
+    assets = StaticAssets().load()
+    env = setup_templates(app, assets)
+    app["admin_password"] = admin_password
+    app["admin_jobs"] = admin_jobs
+
+    async def render_index(data):
+        # Uptime wird beim Rendern eingesetzt und im Browser weitergezählt — sie gehört nicht zum ETag
+        return await env.get_template("index.html").render_async(**data, uptime=format_uptime(data["started_at"]))
+
+    source.render = render_index
+
+    app.router.add_get("/", dashboard_handler)
+    app.router.add_get("/login", login_handler)
+    app.router.add_post("/login", login_handler)
+    app.router.add_get("/admin", admin_handler)
+    app.router.add_get("/logout", logout_handler)
+    app.router.add_post("/admin/twitch/add", twitch_add_handler)
+    app.router.add_post("/admin/user/reset", user_reset_handler)
+    app.router.add_get("/admin/jobs", jobs_handler)
+    app.router.add_get(r"/admin/jobs/{job_id:\d+}", job_handler)
+    assets.setup(app)
+    setup_api(app, source)
+    return app
+
+
+def run_worker(host, port, snapshot_path, admin_password, reuse_port):
+    # Aufträge gehen über die gemeinsame admin_jobs.db an den Bot — der Worker braucht keine Discord-Verbindung
+    db = Database()
+    source = FileSnapshotSource(snapshot_path)
+    app = create_app(source, admin_password, AdminJobQueue(db))
+
+    async def start_source(app):
+        source.start()
+
+    async def stop_source(app):
+        source.stop()
+        await db.close()
+
+    app.on_startup.append(start_source)
+    app.on_cleanup.append(stop_source)
+    web.run_app(app, host=host, port=port, reuse_port=reuse_port, print=None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PRIME-Bot Dashboard als eigener Prozess")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("DASHBOARD_PORT", 1234)))
+    parser.add_argument("--snapshot", default=os.getenv("DASHBOARD_SNAPSHOT", DEFAULT_SNAPSHOT_PATH))
+    parser.add_argument("--workers", type=int, default=1, help="Prozesse, die sich den Port teilen (SO_REUSEPORT)")
+    args = parser.parse_args(argv)
+    worker_args = (args.host, args.port, args.snapshot, os.getenv("DASHBOARD_PASSWORD"))
+
+    if args.workers <= 1:
+        run_worker(*worker_args, reuse_port=False)
+        return 0
+
+    workers = [multiprocessing.Process(target=run_worker, args=(*worker_args, True)) for _ in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    print(f"[DASHBOARD] {args.workers} Worker auf Port {args.port}, Snapshot: {args.snapshot}")
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+            worker.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# tools/db_benchmark.py
+# Vergleicht eine neue aiosqlite-Verbindung pro Aufruf mit dem gepoolten Pfad aus core/database.py
+#   python -m tools.db_benchmark --ops 2000
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import aiosqlite
+
+from core.database import Database
+
+USERS = 1000
+
+BALANCE_SQL = "SELECT balance FROM coins WHERE user_id = ?"
+SETTLE_SQL = "UPDATE coins SET balance = balance - ? WHERE user_id = ?"  # Einsatz abbuchen wie in slots/roulette
+XP_SQL = (
+    "INSERT INTO users (user_id, xp, level, last_message) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(user_id) DO UPDATE SET xp = xp + excluded.xp, level = excluded.level, last_message = excluded.last_message"
+)
+
+# (Name, Datei, SQL, Parameter für Aufruf i)
+CASES = [
+    ("Kontostand lesen", "economy.db", BALANCE_SQL, lambda i: (i % USERS,)),
+    ("Einsatz abrechnen", "economy.db", SETTLE_SQL, lambda i: (1, i % USERS)),
+    ("XP-Upsert", "leveling.db", XP_SQL, lambda i: (i % (USERS * 2), 5, 1, "2024-01-01 00:00:00")),
+]
+
+
+async def prepare(tmp):
+    economy = os.path.join(tmp, "economy.db")
+    leveling = os.path.join(tmp, "leveling.db")
+    async with aiosqlite.connect(economy) as conn:
+        await conn.execute("PRAGMA journal_mode = WAL")
+        await conn.execute("CREATE TABLE coins (user_id INTEGER PRIMARY KEY, balance INTEGER DEFAULT 0)")
+        await conn.executemany("INSERT INTO coins VALUES (?, ?)", [(i, 10 ** 9) for i in range(USERS)])
+        await conn.commit()
+    async with aiosqlite.connect(leveling) as conn:
+        await conn.execute("PRAGMA journal_mode = WAL")
+        await conn.execute(
+            "CREATE TABLE users (user_id INTEGER PRIMARY KEY, xp INTEGER DEFAULT 0, level INTEGER DEFAULT 1, last_message DATETIME)"
+        )
+        await conn.commit()
+
+
+async def per_call(path, sql, params):
+    # So sah es vor dem Pool aus: öffnen, ausführen, committen, schließen
+    async with aiosqlite.connect(path) as conn:
+        async with conn.execute(sql, params) as cursor:
+            row = await cursor.fetchone()
+        await conn.commit()
+        return row
+
+
+async def pooled(db, path, sql, params):
+    if sql.startswith("SELECT"):
+        return await db.fetchone(path, sql, params)
+    return await db.execute(path, sql, params)
+
+
+async def measure(ops, call):
+    started = time.perf_counter()
+    for i in range(ops):
+        await call(i)
+    return ops / (time.perf_counter() - started)
+
+
+async def run(tmp, ops):
+    await prepare(tmp)
+    db = Database()
+    results = []
+    try:
+        for name, filename, sql, params in CASES:
+            path = os.path.join(tmp, filename)
+            before = await measure(ops, lambda i: per_call(path, sql, params(i)))
+            after = await measure(ops, lambda i: pooled(db, path, sql, params(i)))
+            results.append((name, before, after))
+    finally:
+        await db.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pro-Aufruf-Verbindung gegen den Verbindungspool messen")
+    parser.add_argument("--ops", type=int, default=2000, help="Aufrufe pro Fall und Variante")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = asyncio.run(run(tmp, args.ops))
+
+    print(f"{'Fall':<20} {'pro Aufruf':>14} {'Pool':>14} {'Faktor':>8}")
+    for name, before, after in results:
+        print(f"{name:<20} {before:>10.0f}op/s {after:>10.0f}op/s {after / before:>7.1f}x")
+    slower = [name for name, before, after in results if after < before]
+    if slower:
+        print("FEHLER: Pool langsamer bei " + ", ".join(slower))
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# tools/level_curve_benchmark.py
+# Prüft die Levelkurve aus core/levels.py und misst die Neuberechnung einer großen users-Tabelle
+#   python -m tools.level_curve_benchmark --rows 1000000
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from math import isqrt
+
+from core import levels
+from core.database import Database
+
+
+def check_curve(samples=200_000):
+    # Eigenschaften der Kurve; gibt eine Liste von Fehlern zurück
+    failures = []
+    for level in range(1, levels.MAX_TABLE_LEVEL + 50):
+        start = levels.threshold(level)
+        if levels.level_for_xp(start) != level:
+            failures.append(f"threshold({level}) = {start} ergibt Level {levels.level_for_xp(start)}")
+        if start and levels.level_for_xp(start - 1) != level - 1:
+            failures.append(f"{start - 1} XP ergibt nicht Level {level - 1}")
+
+    rng = random.Random(0)
+    previous = 0
+    for xp in sorted(rng.randrange(0, 10 ** 9) for _ in range(samples)):
+        level = levels.level_for_xp(xp)
+        if level < previous:
+            failures.append(f"Kurve fällt bei {xp} XP")
+        previous = level
+        # Tabelle und geschlossene Form müssen übereinstimmen
+        if level != isqrt(xp) // levels.LEVEL_STEP + 1:
+            failures.append(f"{xp} XP: Level {level} passt nicht zur Formel")
+        current, into, needed = levels.progress(xp)
+        if not (current == level and 0 <= into < needed):
+            failures.append(f"progress({xp}) = {(current, into, needed)}")
+    return failures[:20]
+
+
+async def benchmark(rows, path):
+    db = Database()
+    await levels.register(db)
+    rng = random.Random(1)
+    async with db.transaction(path) as conn:
+        await conn.execute("CREATE TABLE users (user_id INTEGER PRIMARY KEY, xp INTEGER DEFAULT 0, level INTEGER DEFAULT 1, last_message DATETIME)")
+        # Absichtlich falsche Level, damit jede Zeile geschrieben werden muss
+        await conn.executemany(
+            "INSERT INTO users (user_id, xp, level) VALUES (?, ?, 1)",
+            ((user_id, rng.randrange(0, 2_000_000)) for user_id in range(rows))
+        )
+
+    started = time.perf_counter()
+    changed = await levels.recompute_levels(db, path)
+    first = time.perf_counter() - started
+
+    started = time.perf_counter()
+    unchanged = await levels.recompute_levels(db, path)
+    second = time.perf_counter() - started
+
+    wrong = await db.fetchone(path, f"SELECT COUNT(*) FROM users WHERE level != {levels.SQL_FUNCTION}(xp)")
+    await db.close()
+    return changed, first, unchanged, second, wrong[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Levelkurve prüfen und Bulk-Neuberechnung messen")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    failures = check_curve()
+    print("Kurve: OK" if not failures else "\n".join(["Kurve: FEHLER", *failures]))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "leveling.db")
+        changed, first, unchanged, second, wrong = asyncio.run(benchmark(args.rows, path))
+    print(f"Neuberechnung: {changed} von {args.rows} Zeilen in {first:.2f}s ({args.rows / first:,.0f} Zeilen/s)")
+    print(f"Zweiter Durchgang: {unchanged} Zeilen geändert in {second:.2f}s")
+    if wrong:
+        failures.append(f"{wrong} Zeilen nach der Neuberechnung falsch")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
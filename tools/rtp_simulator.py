@@ -0,0 +1,104 @@
+# tools/rtp_simulator.py
+# Monte-Carlo-Simulation der Auszahlungstabellen aus core/payouts.py (SLOT_PAYTABLE, ROULETTE_PAYTABLE)
+#   python -m tools.rtp_simulator                 # Bericht
+#   python -m tools.rtp_simulator --check         # Exit-Code 1, wenn sich ein RTP gegenüber BASELINE_RTP ändert
+import argparse
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    sys.exit("Der RTP-Simulator braucht NumPy: pip install numpy")
+
+from core.payouts import ROULETTE_PAYTABLE, SLOT_PAYTABLE
+
+DEFAULT_SPINS = 50_000_000
+CHUNK_SIZE = 10_000_000  # Spins pro Vektor — begrenzt den Speicher auf ~100 MB
+ROULETTE_WAGERS = ("17", "0", "rot", "schwarz", "gerade", "ungerade", "grün")
+
+# Erwarteter RTP je Spiel/Wette — bei Änderungen an den Tabellen bewusst mitziehen
+BASELINE_RTP = {
+    "slots": 207 / 216,
+    "roulette 17": 35 / 37,
+    "roulette 0": 35 / 37,
+    "roulette rot": 36 / 37,
+    "roulette schwarz": 36 / 37,
+    "roulette gerade": 36 / 37,
+    "roulette ungerade": 36 / 37,
+    "roulette grün": 2 / 37,
+}
+BASELINE_TOLERANCE = 1e-9
+
+
+def slots_table():
+    # Alle Walzen sind gleichverteilt und unabhängig: eine Zufallszahl in [0, 6³) wählt die Kombination
+    return np.array(list(SLOT_PAYTABLE.values()), dtype=np.int64)
+
+
+def roulette_table(wager):
+    return np.array(ROULETTE_PAYTABLE[wager], dtype=np.int64)
+
+
+def simulate(table, spins, rng):
+    # Vielfache des Einsatzes je Spin, aufsummiert über Chunks
+    total = total_sq = hits = 0
+    done = 0
+    while done < spins:
+        n = min(CHUNK_SIZE, spins - done)
+        multipliers = table[rng.integers(0, len(table), size=n)]
+        total += int(multipliers.sum())
+        total_sq += int(np.dot(multipliers, multipliers))
+        hits += int(np.count_nonzero(multipliers))
+        done += n
+    mean = total / spins
+    variance = total_sq / spins - mean * mean
+    return {
+        "rtp": mean,
+        "variance": variance,
+        "hit_rate": hits / spins,
+        "stderr": (variance / spins) ** 0.5,
+    }
+
+
+def exact_rtp(table):
+    return float(table.mean())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RTP, Varianz und Trefferquote der PRIME-Casinospiele")
+    parser.add_argument("--spins", type=int, default=DEFAULT_SPINS)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--check", action="store_true", help="gegen BASELINE_RTP prüfen")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    tables = {"slots": slots_table()}
+    tables.update({f"roulette {wager}": roulette_table(wager) for wager in ROULETTE_WAGERS})
+
+    failures = []
+    print(f"{'Spiel':<20} {'RTP':>8} {'exakt':>8} {'Varianz':>9} {'Treffer':>8} {'Spins/s':>12}")
+    for name, table in tables.items():
+        started = time.perf_counter()
+        result = simulate(table, args.spins, rng)
+        elapsed = time.perf_counter() - started
+        exact = exact_rtp(table)
+        print(
+            f"{name:<20} {result['rtp']:>8.4f} {exact:>8.4f} {result['variance']:>9.3f} "
+            f"{result['hit_rate']:>8.2%} {args.spins / elapsed:>12,.0f}"
+        )
+        # Simulation und exakter Wert müssen zusammenpassen, sonst stimmt der Simulator nicht
+        if abs(result["rtp"] - exact) > 5 * result["stderr"]:
+            failures.append(f"{name}: Simulation {result['rtp']:.5f} weicht von exakt {exact:.5f} ab")
+        baseline = BASELINE_RTP.get(name)
+        if baseline is not None and abs(exact - baseline) > BASELINE_TOLERANCE:
+            failures.append(f"{name}: RTP {exact:.5f} statt Baseline {baseline:.5f}")
+
+    if args.check and failures:
+        print("\n".join(["", "❌ Auszahlungstabellen geändert:", *failures]))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
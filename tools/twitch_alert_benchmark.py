@@ -0,0 +1,136 @@
+# tools/twitch_alert_benchmark.py
+# Misst einen Poll von TwitchAlertsCog.check_streams mit vielen Streamern und langsamen Channel.send
+#   python -m tools.twitch_alert_benchmark --streamers 200 --latency 0.3
+import argparse
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+
+from cogs.twitch_alerts import ALERT_CONCURRENCY, TwitchAlertsCog
+from core.twitch import WatchList
+
+TICK_SECONDS = 60  # Intervall von check_streams
+GUILD_ID = 1
+
+
+class FakeChannel:
+    def __init__(self, channel_id, latency):
+        self.id = channel_id
+        self.latency = latency
+        self.sent = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send(self, content=None, embed=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        self.sent += 1
+
+
+class FakeTwitch:
+    # Statt Helix: liefert die aktuell "live" gesetzten Streams
+    def __init__(self):
+        self.streams = []
+
+    async def fetch_streams(self, logins):
+        return list(self.streams)
+
+
+def make_cog(streamers, channel):
+    bot = SimpleNamespace(
+        user=SimpleNamespace(display_avatar=SimpleNamespace(url="https://example.invalid/avatar.png")),
+        dashboard=SimpleNamespace(mark_dirty=lambda: None),
+        get_guild=lambda guild_id: object(),
+        get_channel=lambda channel_id: channel,
+    )
+
+    async def wait_until_ready():
+        pass
+
+    async def log(message, level="INFO"):
+        pass
+
+    bot.wait_until_ready = wait_until_ready
+    bot.log = log
+
+    # Ohne __init__: der braucht Twitch-Zugangsdaten und startet Tasks
+    cog = object.__new__(TwitchAlertsCog)
+    cog.bot = bot
+    cog.last_streams = {}
+    cog.live_streams = {}
+    cog.twitch = FakeTwitch()
+    cog.watchlist = WatchList()
+    for login in streamers:
+        cog.watchlist.add(GUILD_ID, login, channel.id)
+    return cog
+
+
+def stream(login, stream_id):
+    return {"id": stream_id, "user_login": login, "user_name": login, "title": "Benchmark", "game_name": "Test", "viewer_count": 1}
+
+
+async def tick(cog, channel):
+    sent_before = channel.sent
+    started = time.perf_counter()
+    await TwitchAlertsCog.check_streams.coro(cog)
+    return channel.sent - sent_before, time.perf_counter() - started
+
+
+async def run(count, latency, changed):
+    streamers = [f"streamer_{i}" for i in range(count)]
+    channel = FakeChannel(100, latency)
+    cog = make_cog(streamers, channel)
+    results = []
+
+    # 1. Alle gehen gleichzeitig live
+    cog.twitch.streams = [stream(login, f"{login}-1") for login in streamers]
+    results.append(("alle live", count, *await tick(cog, channel)))
+
+    # 2. Nichts ändert sich
+    results.append(("unverändert", 0, *await tick(cog, channel)))
+
+    # 3. Einige starten einen neuen Stream (neue ID), die Hälfte der übrigen geht offline
+    restarted = set(streamers[:changed])
+    cog.twitch.streams = [
+        stream(login, f"{login}-2" if login in restarted else f"{login}-1")
+        for i, login in enumerate(streamers) if login in restarted or i % 2
+    ]
+    results.append(("neue Stream-IDs", changed, *await tick(cog, channel)))
+
+    # 4. Die offline gegangenen kommen mit derselben ID zurück -> zählt als neu
+    cog.twitch.streams = [stream(login, f"{login}-2" if login in restarted else f"{login}-1") for login in streamers]
+    back = sum(1 for i, login in enumerate(streamers) if login not in restarted and not i % 2)
+    results.append(("wieder online", back, *await tick(cog, channel)))
+    return results, channel.max_in_flight
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Alert-Fan-out von check_streams gegen das 60-Sekunden-Intervall messen")
+    parser.add_argument("--streamers", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.3, help="Simulierte Dauer eines Channel.send in Sekunden")
+    parser.add_argument("--changed", type=int, default=20, help="Streamer, die im dritten Poll eine neue Stream-ID haben")
+    args = parser.parse_args(argv)
+
+    results, max_in_flight = asyncio.run(run(args.streamers, args.latency, min(args.changed, args.streamers)))
+
+    failures = []
+    for name, expected, sent, seconds in results:
+        print(f"{name:<16} {sent:>4} Alerts in {seconds:6.2f}s ({seconds / TICK_SECONDS:.0%} des Intervalls)")
+        if sent != expected:
+            failures.append(f"{name}: {sent} Alerts, erwartet {expected}")
+        if seconds >= TICK_SECONDS:
+            failures.append(f"{name}: Poll dauert {seconds:.1f}s und überholt das {TICK_SECONDS}s-Intervall")
+    print(f"Höchstens {max_in_flight} gleichzeitige Sends (Limit {ALERT_CONCURRENCY})")
+    if max_in_flight > ALERT_CONCURRENCY:
+        failures.append(f"{max_in_flight} gleichzeitige Sends, Limit ist {ALERT_CONCURRENCY}")
+    print("OK" if not failures else "\n".join(["FEHLER", *failures]))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+# tools/twitch_stub_check.py
+# Prüft core.twitch.TwitchClient gegen einen lokalen Helix-Stub — ohne echte Twitch-Zugangsdaten
+#   python -m tools.twitch_stub_check
+import argparse
+import asyncio
+import sys
+import time
+
+import aiohttp.web as web
+
+from core.twitch import HELIX_BATCH_SIZE, TwitchClient
+
+
+class HelixStub:
+    # Nachgebaute Token- und /streams-Endpunkte; `mode` steuert, welchen Fehler der nächste Request bekommt
+    def __init__(self):
+        self.token_requests = 0
+        self.stream_requests = []  # (Token, user_logins, first)
+        self.mode = None  # None, "401", "429" oder "empty_bucket"
+        self.app = web.Application()
+        self.app.router.add_post("/oauth2/token", self.token)
+        self.app.router.add_get("/helix/streams", self.streams)
+
+    def reset(self, mode=None):
+        self.token_requests = 0
+        self.stream_requests = []
+        self.mode = mode
+
+    async def token(self, request):
+        self.token_requests += 1
+        return web.json_response({"access_token": f"token-{self.token_requests}", "expires_in": 3600})
+
+    async def streams(self, request):
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        logins = request.query.getall("user_login", [])
+        self.stream_requests.append((token, logins, request.query.get("first")))
+        reset = str(int(time.time()) + 2)
+
+        if self.mode == "401" and token == "token-1":
+            return web.json_response({"message": "Invalid OAuth token"}, status=401)
+        if self.mode == "429" and len(self.stream_requests) == 1:
+            return web.json_response({"message": "Too Many Requests"}, status=429, headers={"Ratelimit-Remaining": "0", "Ratelimit-Reset": reset})
+
+        headers = {"Ratelimit-Remaining": "800", "Ratelimit-Reset": reset}
+        if self.mode == "empty_bucket" and len(self.stream_requests) == 1:
+            headers["Ratelimit-Remaining"] = "0"
+        # Jeder zweite Login ist live
+        data = [{"id": f"s-{login}", "user_login": login, "user_name": login} for login in logins[::2]]
+        return web.json_response({"data": data}, headers=headers)
+
+
+async def log(message, level="INFO"):
+    pass
+
+
+async def check(port):
+    stub = HelixStub()
+    runner = web.AppRunner(stub.app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    base = f"http://127.0.0.1:{port}"
+    client = TwitchClient("id", "secret", log, helix_url=f"{base}/helix", token_url=f"{base}/oauth2/token")
+    failures = []
+
+    try:
+        # 1. 250 Logins (plus Duplikat) -> 3 Requests mit höchstens 100 user_login und first=100
+        logins = [f"streamer_{i}" for i in range(250)]
+        streams = await client.fetch_streams(logins + logins[:1])
+        sizes = sorted(len(batch) for _, batch, _ in stub.stream_requests)
+        if sizes != [50, 100, 100]:
+            failures.append(f"Chunking: Batchgrößen {sizes}, erwartet [50, 100, 100]")
+        if any(first != str(HELIX_BATCH_SIZE) for _, _, first in stub.stream_requests):
+            failures.append("Nicht jeder Request hatte first=100")
+        expected_live = sum(len(logins[i:i + 100][::2]) for i in range(0, 250, 100))
+        if len(streams) != expected_live:
+            failures.append(f"{len(streams)} Streams zurück, erwartet {expected_live}")
+        print(f"Chunking: {len(stub.stream_requests)} Requests, Batches {sizes}, {len(streams)} live")
+
+        # 2. 401 -> genau ein neuer Token, Request wird mit dem neuen Token wiederholt
+        client.access_token = None
+        stub.reset("401")
+        await client.fetch_streams(["a_login"])
+        tokens = [token for token, _, _ in stub.stream_requests]
+        if stub.token_requests != 2 or tokens != ["token-1", "token-2"]:
+            failures.append(f"401: {stub.token_requests} Token-Abrufe, Requests mit {tokens}")
+        print(f"401: {stub.token_requests} Token-Abrufe, Requests mit {tokens}")
+
+        # 3. 429 -> bis Ratelimit-Reset warten, dann erneut
+        stub.reset("429")
+        started = time.monotonic()
+        await client.fetch_streams(["a_login"])
+        waited = time.monotonic() - started
+        if len(stub.stream_requests) != 2 or waited < 0.9:
+            failures.append(f"429: {len(stub.stream_requests)} Requests, {waited:.2f}s gewartet")
+        print(f"429: {len(stub.stream_requests)} Requests, {waited:.2f}s gewartet")
+
+        # 4. Ratelimit-Remaining: 0 bei Erfolg -> der nächste Request wartet auf den Reset
+        stub.reset("empty_bucket")
+        await client.fetch_streams(["a_login"])
+        started = time.monotonic()
+        await client.fetch_streams(["b_login"])
+        waited = time.monotonic() - started
+        if waited < 0.9:
+            failures.append(f"Leerer Bucket: nächster Request nach {waited:.2f}s statt nach dem Reset")
+        print(f"Leerer Bucket: nächster Request nach {waited:.2f}s")
+    finally:
+        await client.close()
+        await runner.cleanup()
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TwitchClient gegen einen lokalen Helix-Stub prüfen")
+    parser.add_argument("--port", type=int, default=18080)
+    args = parser.parse_args(argv)
+
+    failures = asyncio.run(check(args.port))
+    print("OK" if not failures else "\n".join(["FEHLER", *failures]))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+# tools/wallet_stress.py
+# Feuert viele gleichzeitige Einsätze auf einen User und prüft, dass das Wallet nie überzieht
+#   python -m tools.wallet_stress --bets 500 --balance 1000 --stake 7
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+
+from core.database import Database
+from core.leaderboard import Leaderboards
+from core.ledger import Ledger
+from core.wallet import Wallet
+
+USER_ID = 1
+
+
+async def stress(path, bets, balance, stake):
+    db = Database()
+    await db.execute(path, "CREATE TABLE coins (user_id INTEGER PRIMARY KEY, balance INTEGER DEFAULT 0)")
+    await db.execute(path, "INSERT INTO coins (user_id, balance) VALUES (?, ?)", (USER_ID, balance))
+    leaderboards = Leaderboards(db)
+    ledger = Ledger(db, path)
+    await ledger.load()
+    wallet = Wallet(db, leaderboards, ledger, path)
+
+    # Alle Einsätze verlieren (payout 0) — so muss das Konto am Ende exakt leer sein
+    results = await asyncio.gather(*(wallet.settle_bet(USER_ID, stake, 0, "stress") for _ in range(bets)))
+    await ledger.flush()
+    final = (await db.fetchone(path, "SELECT balance FROM coins WHERE user_id = ?", (USER_ID,)))[0]
+    booked = (await db.fetchone(path, "SELECT COUNT(*), COALESCE(SUM(amount), 0) FROM ledger WHERE user_id = ?", (USER_ID,)))
+    await ledger.close()
+    await db.close()
+    return sum(result is not None for result in results), final, booked
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gleichzeitige Einsätze gegen das Wallet")
+    parser.add_argument("--bets", type=int, default=500)
+    parser.add_argument("--balance", type=int, default=1000)
+    parser.add_argument("--stake", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        successes, final, (entries, total) = asyncio.run(stress(os.path.join(tmp, "economy.db"), args.bets, args.balance, args.stake))
+
+    expected = min(args.bets, args.balance // args.stake)
+    expected_final = args.balance - expected * args.stake
+    print(f"{args.bets} Einsätze à {args.stake} auf {args.balance} Coins: {successes} angenommen, Endstand {final}")
+
+    failures = []
+    if successes != expected:
+        failures.append(f"{successes} Einsätze angenommen, erwartet {expected}")
+    if final != expected_final:
+        failures.append(f"Endstand {final}, erwartet {expected_final}")
+    if final < 0:
+        failures.append("Konto überzogen")
+    if (entries, total) != (successes, -successes * args.stake):
+        failures.append(f"Ledger: {entries} Buchungen über {total}, erwartet {successes} über {-successes * args.stake}")
+    print("OK" if not failures else "\n".join(["FEHLER", *failures]))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())